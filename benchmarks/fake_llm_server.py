@@ -0,0 +1,85 @@
+# Local stand-in for the Groq chat completions API, for exercising the LLM
+# gateway (timeouts, retries, circuit breaker) without network access.
+# Point the chatbot at it with GROQ_API_BASE=http://127.0.0.1:<port> and any
+# GROQ_API_KEY.
+import argparse
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = '{"category": "General", "sentiment": "Neutral", "order_id": "None"}'
+
+
+def make_handler(reply: str, latency: float, error_rate: float, error_status: int):
+    class FakeLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client gave up (e.g. a gateway timeout)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(latency)
+            if random.random() < error_rate:
+                self._send(error_status, json.dumps({"error": {"message": "fake upstream error", "type": "server_error"}}).encode())
+                return
+            completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+            created = int(time.time())
+            model = request.get("model", "fake")
+            if request.get("stream"):
+                words = reply.split(" ")
+                chunks = []
+                for i, word in enumerate(words):
+                    delta = {"role": "assistant", "content": word if i == 0 else " " + word}
+                    chunks.append({"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                                   "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                chunks.append({"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                               "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+                self._send(200, body.encode(), "text/event-stream")
+                return
+            self._send(200, json.dumps({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }).encode())
+
+    return FakeLLMHandler
+
+
+def serve(port: int = 0, reply: str = DEFAULT_REPLY, latency: float = 0.0, error_rate: float = 0.0, error_status: int = 503) -> ThreadingHTTPServer:
+    # The caller starts it with serve_forever(), e.g. in a background thread
+    return ThreadingHTTPServer(("127.0.0.1", port), make_handler(reply, latency, error_rate, error_status))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Groq-compatible chat completions API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reply", default=DEFAULT_REPLY)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.reply, args.latency, args.error_rate, args.error_status)
+    print(f"Fake LLM listening on http://127.0.0.1:{server.server_address[1]}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
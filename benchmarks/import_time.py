@@ -0,0 +1,55 @@
+# Startup cost per page: each measurement runs in a fresh interpreter so
+# module caches from earlier pages don't hide the import cost.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SHARED = "import streamlit"
+PAGES = {
+    "Clothing Recommender": "import numpy, pandas, gensim.models, recommender",
+    "Demand Forecasting": "import numpy, forecast_data, forecast_insights, forecast_charts",
+    "Customer Support Chatbot": "import support_chatbot; support_chatbot.get_app()",
+}
+EAGER = "; ".join(PAGES.values())
+
+SNIPPET = """
+import time
+{shared}
+start = time.perf_counter()
+{setup}
+print(time.perf_counter() - start)
+"""
+
+
+def measure(setup: str, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(shared=SHARED, setup=setup)],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import/setup time for each app page.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = [(page, measure(setup, args.repeat)) for page, setup in PAGES.items()]
+    rows.append(("All pages (eager imports)", measure(EAGER, args.repeat)))
+    print(f"{'Page':<30}{'median (ms)':>14}{'min (ms)':>12}")
+    for page, timings in rows:
+        print(f"{page:<30}{statistics.median(timings) * 1000:>14.1f}{min(timings) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
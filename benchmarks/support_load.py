@@ -0,0 +1,192 @@
+# Offline load test for the support chatbot: replays a query corpus through
+# run_customer_support with a deterministic stub LLM and reports latency
+# percentiles, throughput per concurrency level, per-node time and memory
+# per session. Compare runs (e.g. with --json) before deploying graph or
+# handler changes.
+import argparse
+import gc
+import json
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CATEGORIES = ["Complaints", "Refunds", "Delivery", "Payments", "Account", "Promotions", "General", "Escalation"]
+SENTIMENTS = ["Positive", "Neutral", "Negative"]
+PREFIXES = ["", "", "Hi, ", "Hello! ", "Please help: ", "Urgent - "]
+SUFFIXES = ["", "", " Thanks.", " This is really frustrating!", " I love your clothes."]
+# Few-shot dataset block that prefixes the classification prompts (an indented JSON list)
+DATASET_PREAMBLE = re.compile(r"^Given the following dataset of queries:\n(?:\[\]|\[\n.*?\n\])\n", re.DOTALL)
+
+
+def build_corpus(queries: list[str], size: int, seed: int) -> list[str]:
+    # Dataset queries plus deterministic variations (prefixes, suffixes, order ids, case)
+    rng = random.Random(seed)
+    corpus = []
+    while len(corpus) < size:
+        query = rng.choice(queries)
+        variant = rng.random()
+        if variant < 0.25:
+            query = query.rstrip("?.!") + f" Order ID {rng.randint(10000, 99999)}."
+        elif variant < 0.35:
+            query = query.lower()
+        corpus.append(rng.choice(PREFIXES) + query + rng.choice(SUFFIXES))
+    return corpus
+
+
+def make_stub_llm(latency: float):
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class StubLLM(BaseChatModel):
+        # Same answer for the same query every run; sleeps to stand in for the API
+        latency: float = 0.0
+
+        @property
+        def _llm_type(self) -> str:
+            return "stub"
+
+        @staticmethod
+        def _classify(query: str) -> tuple[str, str, str]:
+            digest = zlib.crc32(query.encode("utf-8"))
+            match = re.search(r"\b\d{5,}\b", query)
+            return CATEGORIES[digest % len(CATEGORIES)], SENTIMENTS[(digest >> 8) % len(SENTIMENTS)], match.group(0) if match else "None"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+            prompt = messages[-1].content
+            # Pick the reply from the instruction only: the few-shot dataset
+            # before it can mention sentiment or order IDs too
+            instruction = DATASET_PREAMBLE.sub("", prompt, count=1)
+            query = instruction.rsplit("Query: ", 1)[-1]
+            category, sentiment, order_id = self._classify(query)
+            if instruction.startswith("Classify each of the numbered"):
+                numbered = re.findall(r"^(\d+)\. (.*)$", instruction.rsplit("Queries:\n", 1)[-1], re.MULTILINE)
+                content = json.dumps([
+                    dict(zip(("id", "category", "sentiment", "order_id"), (int(number), *self._classify(text))))
+                    for number, text in numbered
+                ])
+            elif instruction.startswith("Classify the following"):
+                content = json.dumps({"category": category, "sentiment": sentiment, "order_id": order_id})
+            elif instruction.startswith("Analyze the sentiment"):
+                content = sentiment
+            elif instruction.startswith("If the following query contains an order ID"):
+                content = order_id
+            else:
+                content = category
+            time.sleep(self.latency)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    return StubLLM(latency=latency)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def run_level(support_chatbot, corpus: list[str], concurrency: int, turns_per_session: int) -> dict:
+    # Each worker owns its sessions, so a session's turns stay in order
+    support_chatbot.reset_node_timings()
+    chunks = [corpus[i::concurrency] for i in range(concurrency)]
+
+    def worker(index: int) -> list[float]:
+        latencies = []
+        for turn, query in enumerate(chunks[index]):
+            session_id = f"load-{concurrency}-{index}-{turn // turns_per_session}"
+            start = time.perf_counter()
+            support_chatbot.run_customer_support(query, session_id)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = [latency for result in executor.map(worker, range(concurrency)) for latency in result]
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "nodes": support_chatbot.node_timings(),
+    }
+
+
+def memory_per_session(support_chatbot, corpus: list[str], sessions: int, turns_per_session: int) -> float:
+    # Python heap growth per session after `turns_per_session` turns each
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for session in range(sessions):
+        for turn in range(turns_per_session):
+            support_chatbot.run_customer_support(corpus[(session * turns_per_session + turn) % len(corpus)], f"memory-{session}")
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the support chatbot offline with a stub LLM.")
+    parser.add_argument("--requests", type=int, default=400, help="Corpus size per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM latency in seconds")
+    parser.add_argument("--turns-per-session", type=int, default=5)
+    parser.add_argument("--memory-sessions", type=int, default=50)
+    parser.add_argument("--mode", choices=["fused", "parallel", "sequential"], default="fused")
+    parser.add_argument("--cache", choices=["off", "memory"], default="off", help="Classification cache backend")
+    parser.add_argument("--local-threshold", type=float, default=2.0, help="Local fast path threshold (above 1 disables it)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="Replay queries from this JSON list instead of generating them")
+    parser.add_argument("--save-corpus", help="Write the generated corpus here for later replays")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    # The chatbot reads its settings at import time
+    os.environ.update(
+        SUPPORT_CLASSIFICATION_MODE=args.mode,
+        SUPPORT_CACHE_BACKEND=args.cache,
+        SUPPORT_LOCAL_THRESHOLD=str(args.local_threshold),
+        SUPPORT_SESSION_BACKEND="memory",
+    )
+    os.chdir(REPO_DIR)
+    sys.path.insert(0, REPO_DIR)
+    import support_chatbot
+
+    support_chatbot.set_llm(make_stub_llm(args.latency))
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus = json.load(f)
+    else:
+        corpus = build_corpus([item["query"] for item in support_chatbot.load_dataset()["queries"]], args.requests, args.seed)
+    if args.save_corpus:
+        with open(args.save_corpus, "w") as f:
+            json.dump(corpus, f, indent=2)
+
+    support_chatbot.run_customer_support(corpus[0], "warmup")
+    levels = [run_level(support_chatbot, corpus, concurrency, args.turns_per_session) for concurrency in args.concurrency]
+    memory = memory_per_session(support_chatbot, corpus, args.memory_sessions, args.turns_per_session)
+
+    if args.json:
+        print(json.dumps({"levels": levels, "memory_per_session_bytes": memory}, indent=2))
+        return
+    print(f"{'Concurrency':<13}{'req/s':>9}{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}")
+    for level in levels:
+        print(f"{level['concurrency']:<13}{level['throughput_rps']:>9.1f}{level['p50_ms']:>11.1f}{level['p95_ms']:>11.1f}{level['p99_ms']:>11.1f}")
+    print(f"\nPer-node time at concurrency {levels[-1]['concurrency']}:")
+    print(f"{'Node':<30}{'count':>8}{'mean (ms)':>12}{'max (ms)':>12}")
+    for node, timing in sorted(levels[-1]["nodes"].items(), key=lambda item: -item[1]["mean_ms"]):
+        print(f"{node:<30}{timing['count']:>8}{timing['mean_ms']:>12.2f}{timing['max_ms']:>12.2f}")
+    print(f"\nMemory per session ({args.turns_per_session} turns): {memory / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from forecast_data import ForecastTable
+
+# Above this many traces the chart switches to WebGL (Scattergl)
+WEBGL_THRESHOLD = 20
+# Most series the line view draws; larger selections belong in the band view
+MAX_LINE_PRODUCTS = 50
+# Points shipped to the browser in the line view, shared by all traces
+MAX_POINTS = 20000
+BAND_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> tuple[np.ndarray, np.ndarray]:
+    # Largest-Triangle-Three-Buckets: keeps the first and last points and, from
+    # each bucket in between, the point forming the largest triangle with the
+    # previously kept point and the mean of the next bucket
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket b covers rows edges[b]:edges[b + 1]; the last bucket is the final point
+    every = (n - 2) / (n_out - 2)
+    edges = np.minimum(np.floor(np.arange(n_out) * every).astype(np.int64) + 1, n)
+    edges[-1] = n
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x = x[end:edges[bucket + 2]].mean()
+        next_y = y[end:edges[bucket + 2]].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return x[kept], y[kept]
+
+
+def _style(fig: go.Figure, x_range: list, showlegend: bool, legend_title: str | None = None) -> go.Figure:
+    fig.update_layout(
+        title='Weekly Demand Forecast',
+        template='plotly_dark',
+        xaxis_title='Week',
+        yaxis_title='Demand (Units)',
+        xaxis_range=x_range,
+        margin=dict(t=50, b=50, l=50, r=50),
+        plot_bgcolor='#2d3748',
+        paper_bgcolor='#2d3748',
+        font_color='#e2e8f0',
+        showlegend=showlegend,
+        legend=dict(font=dict(size=12), title=legend_title),
+        xaxis=dict(tickfont=dict(size=12)),
+        yaxis=dict(tickfont=dict(size=12))
+    )
+    return fig
+
+
+def line_figure(table: ForecastTable, products: list[str], max_points: int = MAX_POINTS, webgl_threshold: int = WEBGL_THRESHOLD,
+                max_products: int = MAX_LINE_PRODUCTS) -> go.Figure:
+    # One trace per product for at most max_products products; series longer
+    # than their share of max_points are downsampled with LTTB (so the
+    # payload stays within max_points), and many traces are drawn with WebGL
+    products = products[:max_products]
+    scatter = go.Scattergl if len(products) > webgl_threshold else go.Scatter
+    points_per_series = max(3, max_points // max(len(products), 1))
+    fig = go.Figure()
+    weeks = []
+    for product in products:
+        rows = table.series(product)
+        week, yhat = lttb(table.week[rows], table.yhat[rows], points_per_series)
+        weeks.append(week)
+        fig.add_trace(scatter(x=week, y=yhat, mode='lines', name=product, line=dict(width=2)))
+    weeks = np.concatenate(weeks) if weeks else np.array([1, 14])
+    return _style(fig, [weeks.min(), weeks.max()], showlegend=len(products) <= webgl_threshold, legend_title='Product')
+
+
+def band_figure(table: ForecastTable, products: list[str], quantiles: tuple[float, ...] = BAND_QUANTILES) -> go.Figure:
+    # Median and quantile bands across the products per week; the payload
+    # depends on the number of weeks only, not on how many products are shown
+    frame = table.select(products)
+    weeks, week_index = np.unique(frame['week'].to_numpy(), return_inverse=True)
+    product_index = np.unique(frame['Product Name'].cat.codes.to_numpy(), return_inverse=True)[1]
+    matrix = np.full((product_index.max() + 1, len(weeks)), np.nan)
+    matrix[product_index, week_index] = frame['yhat'].to_numpy()
+    levels = np.nanquantile(matrix, quantiles, axis=0)
+    fig = go.Figure()
+    outer = len(quantiles) // 2
+    for i in range(outer):
+        low, high = quantiles[i], quantiles[-1 - i]
+        fig.add_trace(go.Scatter(x=weeks, y=levels[-1 - i], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(
+            x=weeks, y=levels[i], mode='lines', line=dict(width=0), fill='tonexty',
+            fillcolor=f'rgba(96, 165, 250, {0.15 + 0.15 * i:.2f})', name=f'{low:.0%}-{high:.0%} of products'
+        ))
+    if len(quantiles) % 2:
+        fig.add_trace(go.Scatter(x=weeks, y=levels[outer], mode='lines', line=dict(width=2, color='#60a5fa'), name='Median'))
+    return _style(fig, [weeks.min(), weeks.max()], showlegend=True)
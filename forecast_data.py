@@ -0,0 +1,152 @@
+import os
+import tempfile
+
+import numpy as np
+
+FORECAST_CSV = "PyTorch_LSTM_GRU_Forecast.csv"
+FORECAST_TABLE = "forecast_table.npz"
+# Bumped when the stored layout changes so older tables are rebuilt
+TABLE_FORMAT = 2
+
+
+class ForecastTable:
+    # Typed columnar forecast: one int32 code per row into the sorted product
+    # names, int16 week, float32 yhat and datetime64[D] ds. Rows are kept
+    # sorted by (product, week), and offsets[code]:offsets[code + 1] is the
+    # contiguous slice of a product's series, so lookups never scan or sort.
+    def __init__(self, products: np.ndarray, codes: np.ndarray, week: np.ndarray, yhat: np.ndarray, ds: np.ndarray, offsets: np.ndarray | None = None):
+        if offsets is None:
+            order = np.lexsort((week, codes))
+            codes, week, yhat, ds = codes[order], week[order], yhat[order], ds[order]
+            offsets = np.zeros(len(products) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(codes, minlength=len(products)), out=offsets[1:])
+        self.products = products
+        self.codes = codes
+        self.week = week
+        self.yhat = yhat
+        self.ds = ds
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ForecastTable":
+        # Same cleaning the forecast page used to redo on every rerun
+        import pandas as pd
+
+        df = pd.read_csv(path)
+        ds = pd.to_datetime(df['ds'], errors='coerce')
+        yhat = pd.to_numeric(df['yhat'], errors='coerce').fillna(0).round(2)
+        week = pd.to_numeric(df['week'], errors='coerce').fillna(0).astype(int)
+        names = df['Product Name'].str.strip()
+        keep = (ds.notnull() & (yhat != 0) & names.notnull() & (week != 0)).to_numpy()
+        products, codes = np.unique(names[keep].to_numpy(dtype=str), return_inverse=True)
+        return cls(
+            products,
+            codes.astype(np.int32),
+            week[keep].to_numpy(dtype=np.int16),
+            yhat[keep].to_numpy(dtype=np.float32),
+            ds[keep].to_numpy().astype("datetime64[D]"),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ForecastTable":
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(arrays["products"], arrays["codes"], arrays["week"], arrays["yhat"], arrays["ds"], arrays["offsets"])
+
+    def save(self, path: str, source_mtime: float | None = None):
+        # Written to a uniquely named file next to the final name, then renamed over it
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path), suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            try:
+                np.savez(
+                    f,
+                    products=self.products,
+                    codes=self.codes,
+                    week=self.week,
+                    yhat=self.yhat,
+                    ds=self.ds,
+                    offsets=self.offsets,
+                    format=np.int64(TABLE_FORMAT),
+                    source_mtime=np.float64(source_mtime if source_mtime is not None else np.nan),
+                )
+            except BaseException:
+                f.close()
+                os.remove(tmp_path)
+                raise
+        os.replace(tmp_path, path)
+
+    def code(self, product: str) -> int:
+        code = int(np.searchsorted(self.products, product))
+        if code == len(self.products) or self.products[code] != product:
+            raise KeyError(product)
+        return code
+
+    def series(self, product: str) -> slice:
+        # Row slice of one product's series in week order; index any column with it
+        code = self.code(product)
+        return slice(int(self.offsets[code]), int(self.offsets[code + 1]))
+
+    def select(self, products: list[str]):
+        # DataFrame of the given products' rows, each series in week order
+        import pandas as pd
+
+        codes = np.array([self.code(product) for product in products], dtype=np.int64)
+        starts, ends = self.offsets[codes], self.offsets[codes + 1]
+        lengths = ends - starts
+        # Concatenated row ranges without a Python loop over rows
+        rows = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths) + np.arange(lengths.sum())
+        return pd.DataFrame({
+            'ds': self.ds[rows].astype("datetime64[ns]"),
+            'yhat': self.yhat[rows],
+            'Product Name': pd.Categorical.from_codes(self.codes[rows], self.products),
+            'week': self.week[rows],
+        })
+
+    def first_yhat(self) -> np.ndarray:
+        # yhat in each product's earliest week, aligned with self.products
+        starts = self.offsets[:-1]
+        return np.where(starts < self.offsets[1:], self.yhat[np.minimum(starts, len(self.yhat) - 1)], np.nan)
+
+
+def forecast_version(model_dir: str) -> float:
+    # Modification time of the source CSV (or of the binary table without it); used as a cache key
+    for name in (FORECAST_CSV, FORECAST_TABLE):
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            return os.path.getmtime(path)
+    raise FileNotFoundError(f"'{FORECAST_CSV}' not found in '{model_dir}' directory.")
+
+
+def load_forecast(model_dir: str, rebuild: bool = False) -> ForecastTable:
+    # Reads the binary table when it was built from the current CSV, otherwise
+    # parses the CSV. Only rebuild=True (the command line below, run when the
+    # forecast is published) writes the table, so serving processes never
+    # write into the model directory
+    csv_path = os.path.join(model_dir, FORECAST_CSV)
+    table_path = os.path.join(model_dir, FORECAST_TABLE)
+    csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else None
+    if os.path.exists(table_path):
+        with np.load(table_path, allow_pickle=False) as arrays:
+            built_from = float(arrays["source_mtime"])
+            current = "format" in arrays and int(arrays["format"]) == TABLE_FORMAT
+        if current and (csv_mtime is None or built_from == csv_mtime):
+            return ForecastTable.load(table_path)
+    if csv_mtime is None:
+        raise FileNotFoundError(f"'{FORECAST_CSV}' not found in '{model_dir}' directory.")
+    table = ForecastTable.from_csv(csv_path)
+    if rebuild:
+        table.save(table_path, source_mtime=csv_mtime)
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert the forecast CSV into the typed binary table.")
+    parser.add_argument("--model-dir", default="Recommendation System Models")
+    args = parser.parse_args()
+
+    table = load_forecast(args.model_dir, rebuild=True)
+    print(f"Forecast table: {len(table)} rows, {len(table.products)} products in '{os.path.join(args.model_dir, FORECAST_TABLE)}'")
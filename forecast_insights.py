@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from forecast_data import ForecastTable
+
+
+def _group_sum(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    return np.bincount(codes, weights=values, minlength=n_groups)
+
+
+def product_insights(table: ForecastTable) -> pd.DataFrame:
+    # Per-product forecast statistics in a handful of O(rows) NumPy passes
+    # over the (product, week)-sorted table: range, largest week-over-week
+    # drop, peak week, least-squares trend slope and volatility (std of
+    # week-over-week changes). Indexed by product name.
+    codes = table.codes.astype(np.intp)
+    week = table.week.astype(np.float64)
+    yhat = table.yhat.astype(np.float64)
+    n_products = len(table.products)
+
+    counts = np.diff(table.offsets)
+    present = counts > 0
+    safe_counts = np.maximum(counts, 1)
+    starts = table.offsets[:-1]
+    ends = starts + counts - 1
+    nonempty_starts = starts[present]
+
+    minimum = np.full(n_products, np.nan)
+    maximum = np.full(n_products, np.nan)
+    minimum[present] = np.minimum.reduceat(yhat, nonempty_starts)
+    maximum[present] = np.maximum.reduceat(yhat, nonempty_starts)
+    first = np.where(present, yhat[np.minimum(starts, len(yhat) - 1)], np.nan)
+    last = np.where(present, yhat[np.maximum(ends, 0)], np.nan)
+
+    # First week at which each product reaches its maximum
+    peak_rows = np.flatnonzero(yhat == maximum[codes])
+    peak_codes, first_peak = np.unique(codes[peak_rows], return_index=True)
+    peak_week = np.zeros(n_products, dtype=np.int16)
+    peak_week[peak_codes] = week[peak_rows[first_peak]]
+
+    # Week-over-week changes, only between consecutive rows of the same product
+    same_product = codes[1:] == codes[:-1]
+    change_codes = codes[1:][same_product]
+    changes = (yhat[1:] - yhat[:-1])[same_product]
+    change_counts = np.bincount(change_codes, minlength=n_products)
+    max_drop = np.zeros(n_products)
+    np.maximum.at(max_drop, change_codes, -changes)
+    change_mean = _group_sum(change_codes, changes, n_products) / np.maximum(change_counts, 1)
+    change_var = _group_sum(change_codes, changes ** 2, n_products) / np.maximum(change_counts, 1) - change_mean ** 2
+    volatility = np.sqrt(np.clip(change_var, 0, None))
+
+    # Least-squares slope of yhat over week
+    sum_x = _group_sum(codes, week, n_products)
+    sum_y = _group_sum(codes, yhat, n_products)
+    sum_xx = _group_sum(codes, week ** 2, n_products)
+    sum_xy = _group_sum(codes, week * yhat, n_products)
+    denominator = counts * sum_xx - sum_x ** 2
+    slope = np.divide(counts * sum_xy - sum_x * sum_y, denominator, out=np.zeros(n_products), where=denominator > 0)
+
+    insights = pd.DataFrame({
+        'weeks': counts,
+        'mean': sum_y / safe_counts,
+        'first': first,
+        'last': last,
+        'change': last - first,
+        'pct_change': np.divide(last - first, first, out=np.zeros(n_products), where=present & (first != 0)),
+        'min': minimum,
+        'max': maximum,
+        'range': maximum - minimum,
+        'max_weekly_drop': max_drop,
+        'peak_week': peak_week,
+        'slope': slope,
+        'volatility': volatility,
+    }, index=pd.Index(table.products, name='Product Name'))
+    return insights[present]
+
+
+def top_movers(insights: pd.DataFrame, n: int = 5, by: str = 'slope') -> tuple[pd.DataFrame, pd.DataFrame]:
+    # (risers, fallers): the n products with the highest and lowest `by`
+    return insights.nlargest(n, by), insights.nsmallest(n, by)
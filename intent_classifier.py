@@ -0,0 +1,68 @@
+import re
+from text_index import ExampleIndex
+
+NEGATIVE_CUES = [
+    "late", "delayed", "damaged", "wrong", "rude", "unprofessional", "not received", "not delivered",
+    "haven't", "haven’t", "didn't", "didn’t", "isn't", "isn’t", "not working", "declined", "locked",
+    "overcharge", "charged extra", "incorrectly", "terrible", "worst", "angry", "disappointed", "poor",
+    "still waiting", "never", "canceled", "cancelled", "useless"
+]
+POSITIVE_CUES = ["thank", "great", "love", "awesome", "excellent", "happy", "appreciate", "perfect"]
+# Order ids are 5-12 digit numbers ("12345", "#12345") or 4+ digits after a
+# known prefix ("ORD-1234", "AR#98765"). Years, digit groups joined by "-",
+# "/", "." or "+" (phone numbers, dates, prices), card-length numbers and
+# Bangladeshi mobile numbers are not order ids.
+ORDER_ID_PREFIXES = ("ORDER", "ORD", "INV", "AR")
+ORDER_ID_PATTERN = re.compile(
+    r"""
+    (?<![\w+\-/.])
+    (?:
+        (?:""" + "|".join(ORDER_ID_PREFIXES) + r""")[-\#]?\d{4,12}
+        | \#?(?!(?:(?:88)?0)?1[3-9]\d{8}(?!\d))\d{5,12}
+    )
+    (?![\w\-/]|[.,]\d)
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+
+def detect_sentiment(query: str) -> str:
+    query_lower = query.lower()
+    if any(cue in query_lower for cue in NEGATIVE_CUES):
+        return "Negative"
+    if any(cue in query_lower for cue in POSITIVE_CUES):
+        return "Positive"
+    return "Neutral"
+
+def extract_order_id(query: str) -> str:
+    match = ORDER_ID_PATTERN.search(query)
+    return match.group(0).lstrip("#") if match else "None"
+
+# Nearest-example intent classifier over the support dataset. Neighbours vote
+# with weight similarity ** sharpness; the confidence is the winning
+# category's best similarity scaled by its share of the vote.
+class IntentClassifier:
+    def __init__(self, index: ExampleIndex, n_neighbors: int = 3, sharpness: float = 4.0):
+        self.index = index
+        self.n_neighbors = n_neighbors
+        self.sharpness = sharpness
+
+    def predict(self, query: str) -> tuple[str | None, float]:
+        matches = self.index.search(query, self.n_neighbors)
+        votes = {}
+        for example, score in matches:
+            votes[example["category"]] = votes.get(example["category"], 0.0) + max(score, 0.0) ** self.sharpness
+        total = sum(votes.values())
+        if total <= 0:
+            return None, 0.0
+        category = max(votes, key=votes.get)
+        best = max(score for example, score in matches if example["category"] == category)
+        return category, best * votes[category] / total
+
+    def classify(self, query: str) -> dict:
+        category, confidence = self.predict(query)
+        return {
+            "category": category,
+            "confidence": confidence,
+            "sentiment": detect_sentiment(query),
+            "order_id": extract_order_id(query)
+        }
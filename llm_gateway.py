@@ -0,0 +1,182 @@
+import time
+import random
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict
+import numpy as np
+
+class LLMUnavailableError(RuntimeError):
+    pass
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+# Exception types treated as transient connection failures; clients add
+# their own (e.g. httpx.TransportError) through LLMGateway(transient_errors=...)
+TRANSIENT_ERRORS = (TimeoutError, ConnectionError)
+
+def is_retryable(error: Exception, transient_errors: tuple = TRANSIENT_ERRORS) -> bool:
+    # Only rate limits (429), server errors (5xx), timeouts and connection
+    # failures are worth retrying; bad requests, auth errors and bugs will not
+    # get better and fail fast
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(error, transient_errors)
+
+# Opens after failure_threshold consecutive failed calls and rejects calls
+# until reset_timeout has passed; then lets a single trial call through
+# ("half_open") whose outcome closes or reopens it.
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+# Wraps a chat model with bounded concurrency, a per-call deadline, jittered
+# exponential backoff between retries and a circuit breaker. Calls that cannot
+# be served raise LLMUnavailableError so callers can degrade gracefully.
+# A slot is held for as long as its upstream request runs, even after the
+# caller gave up on it at the deadline, so max_concurrency bounds the real
+# number of requests in flight; the HTTP client's own timeout should match
+# `timeout` so abandoned requests end soon after.
+class LLMGateway:
+    def __init__(self, llm, max_concurrency: int = 8, timeout: float = 30.0, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0, breaker: CircuitBreaker | None = None,
+                 transient_errors: tuple = TRANSIENT_ERRORS):
+        self.llm = llm
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.transient_errors = tuple(transient_errors)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        # Calls run on this pool so a hung request can be abandoned at the deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm-gateway")
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self._counts = {"calls": 0, "successes": 0, "failures": 0, "retries": 0, "timeouts": 0, "rejected": 0}
+        self._in_flight = 0
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, capped exponential]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _release_slot(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._semaphore.release()
+
+    def _attempt(self, prompt: Any):
+        # Takes over the slot acquired by the caller; it is released when the
+        # upstream call really finishes, not when the caller stops waiting.
+        # The caller's context carries LangChain callbacks (e.g. token streaming)
+        context = contextvars.copy_context()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(context.run, self.llm.invoke, prompt)
+        except BaseException:
+            self._release_slot()
+            raise
+        future.add_done_callback(self._release_slot)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self._count("timeouts")
+            raise TimeoutError(f"LLM call exceeded {self.timeout:.1f}s")
+
+    def invoke(self, prompt: Any):
+        self._count("calls")
+        # The slot is taken before asking the breaker, so a half-open trial
+        # is never granted to a call that then cannot run
+        if not self._semaphore.acquire(timeout=self.timeout):
+            self._count("rejected")
+            raise LLMUnavailableError("Timed out waiting for a free LLM slot")
+        if not self.breaker.allow():
+            self._semaphore.release()
+            self._count("rejected")
+            raise CircuitOpenError("LLM circuit breaker is open")
+        last_error = None
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt and not self._semaphore.acquire(timeout=self.timeout):
+                    last_error = TimeoutError("Timed out waiting for a free LLM slot")
+                    break
+                start = time.perf_counter()
+                try:
+                    result = self._attempt(prompt)
+                except Exception as error:
+                    last_error = error
+                    if attempt == self.max_retries or not is_retryable(error, self.transient_errors):
+                        break
+                    self._count("retries")
+                    time.sleep(self._backoff(attempt))
+                    continue
+                with self._lock:
+                    self._latencies.append(time.perf_counter() - start)
+                    self._counts["successes"] += 1
+                self.breaker.record_success()
+                return result
+        except BaseException:
+            # Interrupted mid-call: still settle a half-open trial
+            self.breaker.record_failure()
+            raise
+        self._count("failures")
+        self.breaker.record_failure()
+        raise LLMUnavailableError(f"LLM call failed: {last_error}") from last_error
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            counts = dict(self._counts)
+            in_flight = self._in_flight
+        finished = counts["successes"] + counts["failures"] + counts["rejected"]
+        return {
+            **counts,
+            "in_flight": in_flight,
+            "circuit": self.breaker.state,
+            "error_rate": (counts["failures"] + counts["rejected"]) / finished if finished else 0.0,
+            "latency_p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "latency_p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+            "latency_p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else 0.0
+        }
@@ -0,0 +1,583 @@
+import os
+import re
+import copy
+import time
+import shutil
+import uuid
+import numpy as np
+
+
+def _select_top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    # Column positions and scores of the k best entries per row, best first
+    kk = min(k, scores.shape[1])
+    candidates = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+# Top-k engine over the product similarity matrix.
+# Same-name products (including the query itself) are excluded through a
+# precomputed name-id array so no per-item DataFrame lookups are needed.
+class SimilarityIndex:
+    def __init__(self, similarity, product_names, chunk_size: int = 1024):
+        self.similarity = similarity
+        self.product_names = np.asarray(product_names, dtype=object)
+        _, self.name_ids = np.unique(self.product_names.astype(str), return_inverse=True)
+        self.name_ids = self.name_ids.astype(np.int32)
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return len(self.product_names)
+
+    def _top_k_chunk(self, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = np.array(self.similarity[rows], dtype=np.float32)
+        scores[self.name_ids[None, :] == self.name_ids[rows][:, None]] = -np.inf
+        indices, top_scores = _select_top_k(scores, k)
+        indices[~np.isfinite(top_scores)] = -1
+        return indices, top_scores
+
+    def top_k(self, rows, k: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        # Returns (n_queries, k) index and score matrices; missing slots are -1 / -inf
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.intp))
+        indices = np.full((len(rows), k), -1, dtype=np.int64)
+        scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+        if k <= 0 or len(self) == 0:
+            return indices, scores
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+            chunk_indices, chunk_scores = self._top_k_chunk(chunk, k)
+            width = chunk_indices.shape[1]
+            indices[start:start + len(chunk), :width] = chunk_indices
+            scores[start:start + len(chunk), :width] = chunk_scores
+        return indices, scores
+
+    def recommend(self, row: int, k: int = 5) -> list[tuple[int, float]]:
+        indices, scores = self.top_k([row], k)
+        return [(int(i), float(s)) for i, s in zip(indices[0], scores[0]) if i >= 0]
+
+
+def _save_array(path: str, array: np.ndarray):
+    # Write-then-rename so readers never map a half-written file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+# Sparse top-K neighbor store: fixed-width (N, K) index/score arrays built
+# offline from the dense matrix, so serving memory is O(N*K) instead of O(N^2).
+class NeighborStore:
+    def __init__(self, indices: np.ndarray, scores: np.ndarray):
+        self.indices = indices
+        self.scores = scores
+
+    def __len__(self) -> int:
+        return self.indices.shape[0]
+
+    @property
+    def k(self) -> int:
+        return self.indices.shape[1]
+
+    @classmethod
+    def build(cls, similarity, product_names, k: int = 50, chunk_size: int = 1024) -> "NeighborStore":
+        index = SimilarityIndex(similarity, product_names, chunk_size=chunk_size)
+        indices, scores = index.top_k(np.arange(len(index)), k)
+        return cls(indices.astype(np.int32), scores)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str | None = "r") -> "NeighborStore":
+        # Memory-mapped by default so workers on one host share the OS page cache
+        return cls(
+            np.load(os.path.join(path, "indices.npy"), mmap_mode=mmap_mode),
+            np.load(os.path.join(path, "scores.npy"), mmap_mode=mmap_mode),
+        )
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        _save_array(os.path.join(path, "indices.npy"), np.ascontiguousarray(self.indices))
+        _save_array(os.path.join(path, "scores.npy"), np.ascontiguousarray(self.scores))
+
+    def patched(self, vectors: np.ndarray, changed_rows, name_ids: np.ndarray, chunk_size: int = 1024) -> "NeighborStore":
+        # Returns a new store in which every neighbor list touched by the
+        # changed rows is re-scored as a whole from the embedding vectors, so
+        # no list mixes embedding scores with the offline similarity scores.
+        # A list is touched when its row changed, when it holds a changed
+        # product, or when a changed product would enter it (it scores above
+        # the list's weakest neighbor on the embedding scale). Untouched lists
+        # keep their offline scores. The original store is left as it is.
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        changed = np.unique(np.asarray(changed_rows, dtype=np.int64))
+        indices = np.full((len(vectors), self.k), -1, dtype=np.int32)
+        scores = np.full((len(vectors), self.k), -np.inf, dtype=np.float32)
+        indices[:len(self)] = self.indices
+        scores[:len(self)] = self.scores
+        if len(changed) == 0:
+            return NeighborStore(indices, scores)
+
+        touched = np.zeros(len(vectors), dtype=bool)
+        touched[changed] = True
+        touched |= np.isin(indices, changed).any(axis=1)
+        candidates = np.flatnonzero(~touched)
+        for start in range(0, len(candidates), chunk_size):
+            rows = candidates[start:start + chunk_size]
+            neighbors = indices[rows]
+            current = np.einsum("rd,rkd->rk", vectors[rows], vectors[np.maximum(neighbors, 0)])
+            weakest = np.where((neighbors >= 0).all(axis=1), current.min(axis=1), -np.inf)
+            # Best changed-product score per row, accumulated over chunks of the changed rows
+            best = np.full(len(rows), -np.inf, dtype=np.float32)
+            for changed_start in range(0, len(changed), chunk_size):
+                changed_chunk = changed[changed_start:changed_start + chunk_size]
+                changed_scores = vectors[rows] @ vectors[changed_chunk].T
+                changed_scores[name_ids[rows][:, None] == name_ids[changed_chunk][None, :]] = -np.inf
+                np.maximum(best, changed_scores.max(axis=1), out=best)
+            touched[rows] = best > weakest
+
+        rescored = np.flatnonzero(touched)
+        for start in range(0, len(rescored), chunk_size):
+            rows = rescored[start:start + chunk_size]
+            row_scores = vectors[rows] @ vectors.T
+            row_scores[name_ids[rows][:, None] == name_ids[None, :]] = -np.inf
+            positions, top_scores = _select_top_k(row_scores, self.k)
+            positions[~np.isfinite(top_scores)] = -1
+            indices[rows] = -1
+            scores[rows] = -np.inf
+            indices[rows, :positions.shape[1]] = positions
+            scores[rows, :positions.shape[1]] = top_scores
+        return NeighborStore(indices, scores)
+
+    def top_k(self, rows, k: int = 5) -> tuple[np.ndarray, np.ndarray]:
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.intp))
+        if k > self.k:
+            raise ValueError(f"Requested k={k} exceeds the stored neighbor width K={self.k}.")
+        return self.indices[rows, :k].astype(np.int64), self.scores[rows, :k]
+
+    def recommend(self, row: int, k: int = 5) -> list[tuple[int, float]]:
+        indices, scores = self.top_k([row], k)
+        return [(int(i), float(s)) for i, s in zip(indices[0], scores[0]) if i >= 0]
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", str(text).lower())
+
+
+def embed_texts(word_vectors, texts) -> np.ndarray:
+    # Product vector = mean of the Word2Vec vectors of its in-vocabulary tokens
+    vectors = np.zeros((len(texts), word_vectors.vector_size), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = [t for t in tokenize(text) if t in word_vectors.key_to_index]
+        if tokens:
+            vectors[row] = word_vectors[tokens].mean(axis=0)
+    return vectors
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+# Approximate nearest neighbors over product embeddings (IVF-style).
+# Vectors are clustered with spherical k-means; a query scans only the
+# n_probe closest clusters. n_probe == n_lists gives exact search. The
+# centroids and list assignments are saved with the artifacts, so new or
+# changed products are assigned to their nearest cluster without retraining.
+class IVFIndex:
+    def __init__(self, vectors, product_names, n_lists: int | None = None, n_probe: int = 8, n_iter: int = 10, seed: int = 0):
+        self.vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        self._set_names(product_names)
+        n_lists = n_lists or max(1, int(np.sqrt(len(self.vectors))))
+        self.centroids = self._train(min(n_lists, max(len(self.vectors), 1)), n_iter, seed)
+        self.n_probe = n_probe
+        self.lists = [np.empty(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self._add_to_lists(np.arange(len(self.vectors)))
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def _set_names(self, product_names):
+        self.product_names = list(product_names)
+        self._name_to_id = {}
+        self.name_ids = np.array([self._name_id(name) for name in self.product_names], dtype=np.int32)
+
+    def _name_id(self, name: str) -> int:
+        return self._name_to_id.setdefault(name, len(self._name_to_id))
+
+    @classmethod
+    def load(cls, path: str, product_names, n_probe: int = 8, mmap_mode: str | None = "r") -> "IVFIndex":
+        # Vectors are stored normalized and mapped as they are; only the name ids are rebuilt
+        index = cls.__new__(cls)
+        index.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+        index.centroids = np.load(os.path.join(path, "centroids.npy"))
+        if len(product_names) != len(index.vectors):
+            raise ValueError(f"ANN index has {len(index.vectors)} vectors but {len(product_names)} product names were given.")
+        index._set_names(product_names)
+        index.n_probe = n_probe
+        assignments = np.load(os.path.join(path, "assignments.npy"))
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(index.centroids) + 1))
+        index.lists = [order[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        return index
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        assignments = np.zeros(len(self), dtype=np.int32)
+        for list_id, rows in enumerate(self.lists):
+            assignments[rows] = list_id
+        _save_array(os.path.join(path, "vectors.npy"), np.ascontiguousarray(self.vectors))
+        _save_array(os.path.join(path, "centroids.npy"), self.centroids)
+        _save_array(os.path.join(path, "assignments.npy"), assignments)
+
+    def _train(self, n_lists: int, n_iter: int, seed: int) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        if len(self.vectors) == 0:
+            return np.zeros((1, self.vectors.shape[1]), dtype=np.float32)
+        centroids = self.vectors[rng.choice(len(self.vectors), n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assignments = np.argmax(self.vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, self.vectors)
+            counts = np.bincount(assignments, minlength=n_lists)
+            non_empty = counts > 0
+            centroids[non_empty] = _normalize(sums[non_empty])
+        return centroids
+
+    def _add_to_lists(self, rows: np.ndarray):
+        if len(rows) == 0:
+            return
+        assignments = np.argmax(self.vectors[rows] @ self.centroids.T, axis=1)
+        for list_id in np.unique(assignments):
+            self.lists[list_id] = np.concatenate([self.lists[list_id], rows[assignments == list_id]])
+
+    def updated(self, rows, vectors, product_names) -> "IVFIndex":
+        # Copy-on-write update: new or changed products are (re)assigned to
+        # their nearest cluster without retraining the centroids
+        rows = np.asarray(rows, dtype=np.int64)
+        index = copy.copy(self)
+        size = max(len(self), int(rows.max()) + 1 if len(rows) else 0)
+        index.vectors = np.zeros((size, self.vectors.shape[1]), dtype=np.float32)
+        index.vectors[:len(self)] = self.vectors
+        index.vectors[rows] = _normalize(np.asarray(vectors, dtype=np.float32))
+        index.product_names = self.product_names + [""] * (size - len(self))
+        index._name_to_id = dict(self._name_to_id)
+        index.name_ids = np.zeros(size, dtype=np.int32)
+        index.name_ids[:len(self)] = self.name_ids
+        for row, name in zip(rows, product_names):
+            index.product_names[row] = name
+            index.name_ids[row] = index._name_id(name)
+        index.lists = [ids[~np.isin(ids, rows)] for ids in self.lists]
+        index._add_to_lists(rows)
+        return index
+
+    def query(self, vector, k: int = 5, exclude_name: str | None = None, n_probe: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        vector = _normalize(np.asarray(vector, dtype=np.float32))
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ vector), n_probe - 1)[:n_probe]
+        candidates = np.concatenate([self.lists[list_id] for list_id in probe])
+        scores = self.vectors[candidates] @ vector
+        if exclude_name is not None and exclude_name in self._name_to_id:
+            scores[self.name_ids[candidates] == self._name_to_id[exclude_name]] = -np.inf
+        kk = min(k, len(candidates))
+        if kk == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, kk - 1)[:kk]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[np.isfinite(scores[top])]
+        return candidates[top], scores[top]
+
+    def top_k(self, rows, k: int = 5, n_probe: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        rows = np.atleast_1d(np.asarray(rows, dtype=np.intp))
+        indices = np.full((len(rows), k), -1, dtype=np.int64)
+        scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+        for position, row in enumerate(rows):
+            row_indices, row_scores = self.query(self.vectors[row], k, self.product_names[row], n_probe)
+            indices[position, :len(row_indices)] = row_indices
+            scores[position, :len(row_scores)] = row_scores
+        return indices, scores
+
+    def recommend(self, row: int, k: int = 5, n_probe: int | None = None) -> list[tuple[int, float]]:
+        indices, scores = self.query(self.vectors[row], k, self.product_names[row], n_probe)
+        return [(int(i), float(s)) for i, s in zip(indices, scores)]
+
+
+# Columnar product metadata. Each string column is stored as a UTF-8 byte
+# blob plus an offsets array, both plain .npy files that can be memory-mapped.
+class ProductCatalog:
+    def __init__(self, columns: dict[str, tuple[np.ndarray, np.ndarray]]):
+        self.columns = columns
+        self._indexes = {}
+        self._ids = {}
+
+    def __len__(self) -> int:
+        offsets, _ = next(iter(self.columns.values()))
+        return len(offsets) - 1
+
+    @classmethod
+    def from_dataframe(cls, df, columns=("Product Name", "Link")) -> "ProductCatalog":
+        return cls.from_columns({column: df[column].tolist() for column in columns})
+
+    @classmethod
+    def from_columns(cls, columns: dict[str, list]) -> "ProductCatalog":
+        encoded = {}
+        for column, column_values in columns.items():
+            values = [str(v).encode("utf-8") for v in column_values]
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            np.cumsum([len(v) for v in values], out=offsets[1:])
+            data = np.frombuffer(b"".join(values), dtype=np.uint8)
+            encoded[column] = (offsets, data)
+        return cls(encoded)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str | None = "r") -> "ProductCatalog":
+        columns = {}
+        for column in sorted(os.listdir(path)):
+            column_dir = os.path.join(path, column)
+            if os.path.isdir(column_dir):
+                columns[column] = (
+                    np.load(os.path.join(column_dir, "offsets.npy"), mmap_mode=mmap_mode),
+                    np.load(os.path.join(column_dir, "data.npy"), mmap_mode=mmap_mode),
+                )
+        if not columns:
+            raise FileNotFoundError(f"No catalog columns found in '{path}'.")
+        return cls(columns)
+
+    def save(self, path: str):
+        for column, (offsets, data) in self.columns.items():
+            column_dir = os.path.join(path, column)
+            os.makedirs(column_dir, exist_ok=True)
+            _save_array(os.path.join(column_dir, "offsets.npy"), offsets)
+            _save_array(os.path.join(column_dir, "data.npy"), data)
+
+    def value(self, row: int, column: str) -> str:
+        offsets, data = self.columns[column]
+        return bytes(data[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def column(self, column: str) -> list[str]:
+        # Decodes every row from its own slice of the (mapped) blob; callers
+        # that need the whole column repeatedly should keep the list
+        offsets, data = self.columns[column]
+        bounds = offsets.tolist()
+        return [data[start:end].tobytes().decode("utf-8") for start, end in zip(bounds[:-1], bounds[1:])]
+
+    def index(self, column: str) -> dict[str, int]:
+        # value -> first row hash index, built once per column
+        if column not in self._indexes:
+            positions = {}
+            for row, value in enumerate(self.column(column)):
+                positions.setdefault(value, row)
+            self._indexes[column] = positions
+        return self._indexes[column]
+
+    def ids(self, column: str) -> np.ndarray:
+        # Dense integer id per row; rows with equal values share an id
+        if column not in self._ids:
+            _, inverse = np.unique(np.asarray(self.column(column), dtype=str), return_inverse=True)
+            self._ids[column] = inverse.astype(np.int32)
+        return self._ids[column]
+
+    def find(self, column: str, value: str) -> int:
+        return self.index(column)[value]
+
+    def updated(self, products: list[dict], key_column: str = "Link") -> tuple["ProductCatalog", np.ndarray]:
+        # Products whose key already exists replace that row, others are appended
+        values = {column: self.column(column) for column in self.columns}
+        positions = dict(self.index(key_column))
+        rows = []
+        for product in products:
+            row = positions.get(str(product[key_column]))
+            if row is None:
+                row = len(values[key_column])
+                positions[str(product[key_column])] = row
+                for column_values in values.values():
+                    column_values.append("")
+            for column, column_values in values.items():
+                if column in product:
+                    column_values[row] = str(product[column])
+            rows.append(row)
+        return ProductCatalog.from_columns(values), np.array(rows, dtype=np.int64)
+
+
+# Precomputed top-k recommendations for a set of catalog rows, stored as a
+# compact .npz so the UI, emails and external services can serve by lookup.
+class RecommendationTable:
+    def __init__(self, rows: np.ndarray, indices: np.ndarray, scores: np.ndarray):
+        order = np.argsort(rows, kind="stable")
+        self.rows = rows[order]
+        self.indices = indices[order]
+        self.scores = scores[order]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def load(cls, path: str) -> "RecommendationTable":
+        with np.load(path) as data:
+            return cls(data["rows"], data["indices"], data["scores"])
+
+    def save(self, path: str):
+        np.savez_compressed(path, rows=self.rows, indices=self.indices, scores=self.scores)
+
+    def recommend(self, row: int, k: int | None = None) -> list[tuple[int, float]]:
+        position = np.searchsorted(self.rows, row)
+        if position == len(self.rows) or self.rows[position] != row:
+            raise KeyError(row)
+        return [(int(i), float(s)) for i, s in zip(self.indices[position, :k], self.scores[position, :k]) if i >= 0]
+
+    def to_records(self, catalog: "ProductCatalog") -> list[dict]:
+        records = []
+        for row, indices, scores in zip(self.rows, self.indices, self.scores):
+            for rank, (index, score) in enumerate(zip(indices, scores), 1):
+                if index >= 0:
+                    records.append({
+                        "Product Name": catalog.value(int(row), "Product Name"),
+                        "Rank": rank,
+                        "Recommended Product": catalog.value(int(index), "Product Name"),
+                        "Link": catalog.value(int(index), "Link"),
+                        "Score": float(score),
+                    })
+        return records
+
+
+def precompute_recommendations(catalog: "ProductCatalog", index, product_names=None, k: int = 5, chunk_size: int = 4096) -> RecommendationTable:
+    # Batch top-k over the whole catalog (or the given product names) in vectorized chunks
+    if product_names is None:
+        rows = np.arange(len(catalog))
+    else:
+        positions = catalog.index("Product Name")
+        missing = [name for name in product_names if name not in positions]
+        if missing:
+            raise KeyError(f"Products not found in the catalog: {missing[:5]}")
+        rows = np.array([positions[name] for name in product_names], dtype=np.int64)
+    indices = np.full((len(rows), k), -1, dtype=np.int64)
+    scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+    for start in range(0, len(rows), chunk_size):
+        chunk_indices, chunk_scores = index.top_k(rows[start:start + chunk_size], k)
+        indices[start:start + chunk_size] = chunk_indices
+        scores[start:start + chunk_size] = chunk_scores
+    return RecommendationTable(rows, indices.astype(np.int32), scores)
+
+
+# Catalog and neighbor store are published together: each build or update
+# writes a complete set into a new version directory under ARTIFACTS_DIR and
+# then switches the CURRENT_LINK symlink to it with one atomic rename, so a
+# reader that resolves the link once never sees a mismatched pair. The
+# Word2Vec ANN index is published alongside them when it is available.
+ARTIFACTS_DIR = "recommender_artifacts"
+CURRENT_LINK = "current"
+
+
+def artifact_version(model_dir: str) -> str | None:
+    # Name of the published version directory (None before the first build); used as a cache key
+    try:
+        return os.readlink(os.path.join(model_dir, ARTIFACTS_DIR, CURRENT_LINK))
+    except FileNotFoundError:
+        return None
+
+
+def load_artifacts(model_dir: str, version: str | None = None, mmap_mode: str | None = "r") -> tuple[ProductCatalog, NeighborStore]:
+    version = version or artifact_version(model_dir)
+    if version is None:
+        raise FileNotFoundError(f"No recommender artifacts in '{model_dir}'; run 'python recommender.py build'.")
+    path = os.path.join(model_dir, ARTIFACTS_DIR, version)
+    return (
+        ProductCatalog.load(os.path.join(path, "product_catalog"), mmap_mode=mmap_mode),
+        NeighborStore.load(os.path.join(path, "similarity_neighbors"), mmap_mode=mmap_mode),
+    )
+
+
+def load_ivf_index(model_dir: str, version: str, product_names, mmap_mode: str | None = "r") -> IVFIndex:
+    # Raises FileNotFoundError for versions published without an ANN index
+    return IVFIndex.load(os.path.join(model_dir, ARTIFACTS_DIR, version, "ann_index"), product_names, mmap_mode=mmap_mode)
+
+
+def publish_artifacts(model_dir: str, catalog: ProductCatalog, store: NeighborStore, ann_index: IVFIndex | None = None, keep: int = 3) -> str:
+    if len(store) != len(catalog):
+        raise ValueError(f"Neighbor store has {len(store)} rows but the catalog has {len(catalog)}.")
+    if ann_index is not None and len(ann_index) != len(catalog):
+        raise ValueError(f"ANN index has {len(ann_index)} rows but the catalog has {len(catalog)}.")
+    root = os.path.join(model_dir, ARTIFACTS_DIR)
+    version = f"v{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    path = os.path.join(root, version)
+    os.makedirs(path)
+    catalog.save(os.path.join(path, "product_catalog"))
+    store.save(os.path.join(path, "similarity_neighbors"))
+    if ann_index is not None:
+        ann_index.save(os.path.join(path, "ann_index"))
+    tmp_link = os.path.join(root, f".{CURRENT_LINK}.{version}")
+    os.symlink(version, tmp_link)
+    os.replace(tmp_link, os.path.join(root, CURRENT_LINK))
+    # Older versions stay around briefly for readers that resolved the link before the switch
+    versions = sorted(
+        (os.path.join(root, name) for name in os.listdir(root) if name.startswith("v") and name != version),
+        key=os.path.getmtime
+    )
+    for old_path in versions[:max(len(versions) - (keep - 1), 0)]:
+        shutil.rmtree(old_path, ignore_errors=True)
+    return version
+
+
+def apply_update(catalog: ProductCatalog, store: NeighborStore, word_vectors, products: list[dict], key_column: str = "Link", ann_index: IVFIndex | None = None) -> tuple[ProductCatalog, NeighborStore, IVFIndex, np.ndarray]:
+    # New catalog, neighbor store and ANN index with the given products added
+    # or changed, plus their rows. With an existing ANN index only the changed
+    # rows are embedded and assigned; without one it is trained once here.
+    catalog, rows = catalog.updated(products, key_column)
+    if ann_index is None:
+        ann_index = IVFIndex(embed_texts(word_vectors, catalog.column("Product Name")), catalog.column("Product Name"))
+    else:
+        names = [catalog.value(int(row), "Product Name") for row in rows]
+        ann_index = ann_index.updated(rows, embed_texts(word_vectors, names), names)
+    store = store.patched(ann_index.vectors, rows, catalog.ids("Product Name"))
+    return catalog, store, ann_index, rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+    from gensim.models import Word2Vec
+
+    parser = argparse.ArgumentParser(description="Build or update the memory-mappable recommender artifacts.")
+    parser.add_argument("--model-dir", default="Recommendation System Models")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Build the catalog and top-K neighbor store from the dense matrix")
+    build_parser.add_argument("--k", type=int, default=50)
+    update_parser = subparsers.add_parser("update", help="Add or change products without a full rebuild")
+    update_parser.add_argument("products", help="CSV file with 'Product Name' and 'Link' columns")
+    update_parser.add_argument("--key-column", default="Link")
+    precompute_parser = subparsers.add_parser("precompute", help="Precompute top-k recommendations for many products")
+    precompute_parser.add_argument("--k", type=int, default=5)
+    precompute_parser.add_argument("--products", help="Text file with one product name per line (default: whole catalog)")
+    precompute_parser.add_argument("--output", default="recommendations.npz", help="Output .npz, or .csv for a readable export")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        df = pd.read_pickle(os.path.join(args.model_dir, "processed_data.pkl"))
+        similarity_matrix = np.load(os.path.join(args.model_dir, "similarity_matrix.npy"), mmap_mode="r")
+        store = NeighborStore.build(similarity_matrix, df['Product Name'].to_numpy(), k=args.k)
+        word2vec_model = Word2Vec.load(os.path.join(args.model_dir, "word2vec_model.model"), mmap='r')
+        product_names = df['Product Name'].astype(str).tolist()
+        ann_index = IVFIndex(embed_texts(word2vec_model.wv, product_names), product_names)
+        version = publish_artifacts(args.model_dir, ProductCatalog.from_dataframe(df), store, ann_index)
+        print(f"Published {len(df)} catalog rows and {len(store)} x {store.k} neighbors as '{version}' in '{args.model_dir}'")
+    elif args.command == "update":
+        word2vec_model = Word2Vec.load(os.path.join(args.model_dir, "word2vec_model.model"), mmap='r')
+        version = artifact_version(args.model_dir)
+        catalog, store = load_artifacts(args.model_dir, version)
+        try:
+            ann_index = load_ivf_index(args.model_dir, version, catalog.column("Product Name"))
+        except FileNotFoundError:
+            ann_index = None
+        products = pd.read_csv(args.products, dtype=str).fillna("").to_dict("records")
+        catalog, store, ann_index, rows = apply_update(catalog, store, word2vec_model.wv, products, args.key_column, ann_index)
+        version = publish_artifacts(args.model_dir, catalog, store, ann_index)
+        print(f"Updated {len(rows)} products; published '{version}' with {len(catalog)} catalog rows")
+    elif args.command == "precompute":
+        catalog, store = load_artifacts(args.model_dir)
+        product_names = None
+        if args.products:
+            with open(args.products, "r", encoding="utf-8") as f:
+                product_names = [line.strip() for line in f if line.strip()]
+        table = precompute_recommendations(catalog, store, product_names, k=args.k)
+        if args.output.endswith(".csv"):
+            pd.DataFrame(table.to_records(catalog)).to_csv(args.output, index=False)
+        else:
+            table.save(args.output)
+        print(f"Saved top-{args.k} recommendations for {len(table)} products to '{args.output}'")
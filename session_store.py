@@ -0,0 +1,274 @@
+import os
+import json
+import time
+import base64
+import sqlite3
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint, CheckpointMetadata, CheckpointTuple, ChannelVersions
+
+# Key/value session store with write-behind batching and TTL expiry.
+# put() buffers records; they are written together on flush(), which runs
+# automatically once batch_size records are pending or flush_interval has
+# passed (checked on put, or by a background thread with
+# background_flush=True). Repeated puts of a key before a flush collapse into
+# one write. Expired records are deleted on every expire_every-th flush.
+class SessionStore(ABC):
+    def __init__(self, ttl_seconds: float | None = 7 * 24 * 3600, batch_size: int = 32, flush_interval: float = 1.0,
+                 expire_every: int = 100, background_flush: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.expire_every = expire_every
+        self._pending = {}
+        self._lock = threading.RLock()
+        self._last_flush = time.monotonic()
+        self._flushes = 0
+        self._closed = threading.Event()
+        if background_flush:
+            threading.Thread(target=self._flush_periodically, name="session-store-flush", daemon=True).start()
+
+    @abstractmethod
+    def _read(self, key: str) -> Dict | None:
+        ...
+
+    @abstractmethod
+    def _write_many(self, records: Dict[str, Dict]):
+        ...
+
+    @abstractmethod
+    def _delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def _expire(self, cutoff: float) -> int:
+        ...
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def get(self, key: str) -> Dict | None:
+        with self._lock:
+            record = self._pending.get(key) or self._read(key)
+        if record is None:
+            return None
+        if self.ttl_seconds is not None and time.time() - record["updated_at"] > self.ttl_seconds:
+            return None
+        return record["value"]
+
+    def put(self, key: str, value: Dict):
+        with self._lock:
+            self._pending[key] = {"value": value, "updated_at": time.time()}
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._pending.pop(key, None)
+            self._delete(key)
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._write_many(self._pending)
+                self._pending = {}
+                self._flushes += 1
+                if self.ttl_seconds is not None and self.expire_every and self._flushes % self.expire_every == 0:
+                    self._expire(time.time() - self.ttl_seconds)
+            self._last_flush = time.monotonic()
+
+    def expire(self) -> int:
+        # Deletes records older than the TTL; returns how many were removed
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            self.flush()
+            return self._expire(time.time() - self.ttl_seconds)
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+
+class MemorySessionStore(SessionStore):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._records = {}
+
+    def _read(self, key: str) -> Dict | None:
+        return self._records.get(key)
+
+    def _write_many(self, records: Dict[str, Dict]):
+        self._records.update(records)
+
+    def _delete(self, key: str):
+        self._records.pop(key, None)
+
+    def _expire(self, cutoff: float) -> int:
+        expired = [key for key, record in self._records.items() if record["updated_at"] < cutoff]
+        for key in expired:
+            del self._records[key]
+        return len(expired)
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path: str = "support_sessions.sqlite3", **kwargs):
+        super().__init__(**kwargs)
+        # One connection per store, reused for every read and batched write
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+        self._conn.commit()
+
+    def _read(self, key: str) -> Dict | None:
+        row = self._conn.execute("SELECT value, updated_at FROM sessions WHERE key = ?", (key,)).fetchone()
+        return {"value": json.loads(row[0]), "updated_at": row[1]} if row else None
+
+    def _write_many(self, records: Dict[str, Dict]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sessions (key, value, updated_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(record["value"]), record["updated_at"]) for key, record in records.items()]
+            )
+
+    def _delete(self, key: str):
+        with self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+
+    def _expire(self, cutoff: float) -> int:
+        with self._conn:
+            return self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+
+    def close(self):
+        super().close()
+        self._conn.close()
+
+class FileSessionStore(SessionStore):
+    # One JSON file per key, replaced atomically; suitable for a shared volume
+    def __init__(self, directory: str = "support_sessions", **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read(self, key: str) -> Dict | None:
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_many(self, records: Dict[str, Dict]):
+        for key, record in records.items():
+            path = self._path(key)
+            with open(path + ".tmp", "w") as f:
+                json.dump(record, f)
+            os.replace(path + ".tmp", path)
+
+    def _delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _expire(self, cutoff: float) -> int:
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".json") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        return removed
+
+def _encode(typed: Tuple[str, bytes]) -> List[str]:
+    return [typed[0], base64.b64encode(typed[1]).decode("ascii")]
+
+def _decode(encoded: List[str]) -> Tuple[str, bytes]:
+    return encoded[0], base64.b64decode(encoded[1])
+
+# LangGraph checkpointer over a SessionStore. Only the latest checkpoint of
+# each thread is kept (with its pending writes), which is all the support
+# graph needs to resume a conversation.
+class StoreCheckpointer(BaseCheckpointSaver):
+    def __init__(self, store: SessionStore):
+        super().__init__()
+        self.store = store
+
+    @staticmethod
+    def _key(config: RunnableConfig) -> str:
+        configurable = config["configurable"]
+        return f"checkpoint:{configurable['thread_id']}:{configurable.get('checkpoint_ns', '')}"
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        record = self.store.get(self._key(config))
+        if record is None:
+            return None
+        requested_id = config["configurable"].get("checkpoint_id")
+        if requested_id and requested_id != record["checkpoint_id"]:
+            return None
+        configurable = config["configurable"]
+        checkpoint_config = {"configurable": {
+            "thread_id": configurable["thread_id"],
+            "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+            "checkpoint_id": record["checkpoint_id"]
+        }}
+        parent_config = None
+        if record["parent_id"]:
+            parent_config = {"configurable": {**checkpoint_config["configurable"], "checkpoint_id": record["parent_id"]}}
+        return CheckpointTuple(
+            config=checkpoint_config,
+            checkpoint={**self.serde.loads_typed(_decode(record["checkpoint"])), "pending_sends": []},
+            metadata=self.serde.loads_typed(_decode(record["metadata"])),
+            parent_config=parent_config,
+            pending_writes=[(task_id, channel, self.serde.loads_typed(_decode(value))) for task_id, channel, value in record["writes"]]
+        )
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None, before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        if config is None:
+            return
+        checkpoint = self.get_tuple(config)
+        if checkpoint is not None:
+            yield checkpoint
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        stored = checkpoint.copy()
+        stored.pop("pending_sends", None)
+        self.store.put(self._key(config), {
+            "checkpoint_id": checkpoint["id"],
+            "parent_id": config["configurable"].get("checkpoint_id"),
+            "checkpoint": _encode(self.serde.dumps_typed(stored)),
+            "metadata": _encode(self.serde.dumps_typed(metadata)),
+            "writes": []
+        })
+        return {"configurable": {
+            "thread_id": config["configurable"]["thread_id"],
+            "checkpoint_ns": config["configurable"].get("checkpoint_ns", ""),
+            "checkpoint_id": checkpoint["id"]
+        }}
+
+    def put_writes(self, config: RunnableConfig, writes: List[Tuple[str, Any]], task_id: str) -> None:
+        key = self._key(config)
+        with self.store._lock:
+            record = self.store.get(key)
+            if record is None or record["checkpoint_id"] != config["configurable"].get("checkpoint_id"):
+                return
+            record = {**record, "writes": record["writes"] + [[task_id, channel, _encode(self.serde.dumps_typed(value))] for channel, value in writes]}
+            self.store.put(key, record)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None, before: Optional[RunnableConfig] = None, limit: Optional[int] = None):
+        for checkpoint in self.list(config, filter=filter, before=before, limit=limit):
+            yield checkpoint
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: List[Tuple[str, Any]], task_id: str) -> None:
+        self.put_writes(config, writes, task_id)
@@ -0,0 +1,236 @@
+import os
+import csv
+import sys
+import json
+import time
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
+import support_chatbot
+
+TRIAGE_FIELDS = ["id", "query", "category", "sentiment", "order_id", "escalated_to", "classification_source", "response"]
+
+def read_tickets(path: str, query_column: str = "query", id_column: str | None = None, on_error: Callable[[Dict], None] | None = None) -> Iterator[Tuple[str, str]]:
+    # Streams (ticket id, query) from a CSV or JSONL export; without an id column
+    # tickets are numbered by position so reruns over the same file line up.
+    # A JSONL line that does not parse or a row without a ticket id is passed
+    # to on_error (as {"row", "data", "error"}) and skipped; without on_error
+    # it raises ValueError
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = (line for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+            if id_column and rows.fieldnames is not None and id_column not in rows.fieldnames:
+                raise ValueError(f"'{path}' has no '{id_column}' column.")
+        for number, row in enumerate(rows, start=1):
+            data = row
+            try:
+                if isinstance(row, str):
+                    row = json.loads(row)
+                    if not isinstance(row, dict):
+                        raise ValueError("not a JSON object")
+                ticket_id = row.get(id_column) if id_column else number
+                if ticket_id in (None, ""):
+                    raise ValueError(f"no '{id_column}' value")
+            except ValueError as e:
+                if on_error is None:
+                    raise ValueError(f"{path}, row {number}: {e}") from e
+                on_error({"row": number, "data": data, "error": repr(e)})
+                continue
+            query = str(row.get(query_column) or "").strip()
+            if query:
+                yield str(ticket_id), query
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+def _csv_records(path: str) -> Iterator[Dict[str, str]]:
+    # Complete rows of a triage CSV. A last row cut short by an interrupted
+    # run (an unterminated quote, missing fields or no final line break) is
+    # left out, as is any row with the wrong number of fields.
+    ends_with_newline = _ends_with_newline(path)
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, strict=True)
+        header = next(reader, None)
+        previous = None
+        try:
+            for row in reader:
+                if previous is not None:
+                    yield previous
+                previous = dict(zip(header, row)) if len(row) == len(header) else None
+        except csv.Error:
+            # The row after `previous` is the broken one
+            if previous is not None:
+                yield previous
+            return
+        if previous is not None and ends_with_newline:
+            yield previous
+
+def _csv_is_complete(path: str) -> bool:
+    if not _ends_with_newline(path):
+        return False
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, strict=True)
+        try:
+            header = next(reader, [])
+            return all(len(row) == len(header) for row in reader)
+        except csv.Error:
+            return False
+
+def completed_ids(path: str) -> Set[str]:
+    # The output file doubles as the checkpoint: every complete ticket in it is done
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return set()
+    if not path.endswith(".jsonl"):
+        return {row["id"] for row in _csv_records(path)}
+    with open(path, "r", encoding="utf-8") as f:
+        done = set()
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (json.JSONDecodeError, KeyError):
+                pass  # a line cut short by an interrupted run
+        return done
+
+class TriageWriter:
+    # Appends results as JSONL or CSV, flushed after every batch. A row cut
+    # short by an interrupted run is dropped (CSV, by rewriting the file
+    # without it) or ended (JSONL, where it no longer parses) before
+    # anything is appended
+    def __init__(self, path: str):
+        self.path = path
+        self.jsonl = path.endswith(".jsonl")
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not self.jsonl and not is_new and not _csv_is_complete(path):
+            self._rewrite_complete_csv()
+        needs_newline = self.jsonl and not is_new and not _ends_with_newline(path)
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+        self._csv = None if self.jsonl else csv.DictWriter(self._file, fieldnames=TRIAGE_FIELDS)
+        if self._csv is not None and is_new:
+            self._csv.writeheader()
+
+    def _rewrite_complete_csv(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=TRIAGE_FIELDS)
+            writer.writeheader()
+            writer.writerows(_csv_records(self.path))
+        os.replace(tmp_path, self.path)
+
+    def write(self, records: List[Dict[str, str]]):
+        for record in records:
+            if self.jsonl:
+                self._file.write(json.dumps(record) + "\n")
+            else:
+                self._csv.writerow(record)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def _unique(tickets: Iterable[Tuple[str, str]], done: Set[str], stats: Dict[str, int]) -> Iterator[Tuple[str, str]]:
+    # Drops tickets already in the output (counted as skipped) and later
+    # repeats of an id in this run (counted as duplicates)
+    seen = set()
+    for ticket_id, query in tickets:
+        if ticket_id in done:
+            stats["skipped"] += 1
+        elif ticket_id in seen:
+            stats["duplicates"] += 1
+        else:
+            seen.add(ticket_id)
+            yield ticket_id, query
+
+def triage(tickets: Iterable[Tuple[str, str]], output: str, batch_size: int = 32, concurrency: int = 8, mode: str | None = None, errors: str | None = None, progress=None) -> Dict[str, int]:
+    # Runs each ticket through the support graph (the same classification,
+    # handlers and route_query escalation as the chat box) in batches of
+    # batch_size with at most `concurrency` graph runs in flight, appending
+    # results as each batch finishes. Each batch is classified up front by
+    # classify_batch (one LLM call per CLASSIFY_BATCH_SIZE tickets), so the
+    # graph runs only call the LLM for tickets it could not classify.
+    # Tickets already in `output` are skipped, so an interrupted run resumes
+    # where it stopped; a repeated id is triaged once; failed tickets go to
+    # `errors` and are retried on the next run.
+    app = support_chatbot.get_app(mode, checkpointed=False)
+    writer = TriageWriter(output)
+    done = completed_ids(output)
+    stats = {"skipped": 0, "duplicates": 0, "processed": 0, "failed": 0}
+    error_file = open(errors or output + ".errors.jsonl", "a", encoding="utf-8")
+    try:
+        for batch in _batches(_unique(tickets, done, stats), batch_size):
+            try:
+                classifications = support_chatbot.classify_batch([query for _, query in batch])
+            except Exception:
+                # e.g. a misconfigured client; each ticket then fails (and is logged) on its own
+                classifications = [None] * len(batch)
+            inputs = [
+                support_chatbot.support_input(query, f"ticket-{ticket_id}", [], None, classification)
+                for (ticket_id, query), classification in zip(batch, classifications)
+            ]
+            results = app.batch(inputs, config={"max_concurrency": concurrency}, return_exceptions=True)
+            records = []
+            for (ticket_id, query), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    error_file.write(json.dumps({"id": ticket_id, "query": query, "error": repr(result)}) + "\n")
+                    stats["failed"] += 1
+                    continue
+                output_state = support_chatbot.support_output(result)
+                records.append({"id": ticket_id, "query": query, **{field: output_state[field] for field in TRIAGE_FIELDS[2:]}})
+            writer.write(records)
+            error_file.flush()
+            stats["processed"] += len(records)
+            if progress:
+                progress(stats)
+    finally:
+        writer.close()
+        error_file.close()
+    return stats
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Triage a CSV/JSONL export of support tickets through the support graph.")
+    parser.add_argument("tickets", help="CSV or JSONL file of customer queries")
+    parser.add_argument("--output", default="triage.jsonl", help="Results file (.jsonl or .csv); reruns resume from it")
+    parser.add_argument("--errors", help="Failed tickets (default: <output>.errors.jsonl)")
+    parser.add_argument("--query-column", default="query")
+    parser.add_argument("--id-column", help="Ticket id column (default: row number)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mode", choices=["fused", "parallel", "sequential"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    errors = args.errors or args.output + ".errors.jsonl"
+    unreadable = []
+
+    def log_unreadable(record: Dict):
+        # Runs between batches, after triage has flushed its own error lines
+        unreadable.append(record)
+        with open(errors, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def report(stats: Dict[str, int]):
+        rate = stats["processed"] / (time.perf_counter() - start)
+        print(f"\rprocessed {stats['processed']} (failed {stats['failed']}, skipped {stats['skipped']}, duplicates {stats['duplicates']}) at {rate:.1f} tickets/s", end="", file=sys.stderr)
+
+    stats = triage(
+        read_tickets(args.tickets, args.query_column, args.id_column, on_error=log_unreadable),
+        args.output,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        mode=args.mode,
+        errors=errors,
+        progress=report
+    )
+    print(file=sys.stderr)
+    print(f"Triaged {stats['processed']} tickets into '{args.output}' ({stats['failed']} failed, {stats['skipped']} already done, {stats['duplicates']} duplicate ids, {len(unreadable)} unreadable rows)")
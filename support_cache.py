@@ -0,0 +1,248 @@
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+import numpy as np
+from scipy import sparse
+from text_index import embed
+
+def normalize_query(query: str) -> str:
+    query = re.sub(r"\s+", " ", query.lower()).strip()
+    return query.strip(" ?!.,;:")
+
+# Storage backends keep (value, created_at) per key in least-recently-used order
+class MemoryBackend:
+    def __init__(self):
+        self._entries = OrderedDict()
+
+    def get(self, key: str) -> Tuple[Dict[str, str], float] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Dict[str, str], created_at: float):
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def keys(self) -> List[str]:
+        return list(self._entries)
+
+    def evict(self, max_entries: int) -> List[str]:
+        evicted = []
+        while len(self._entries) > max_entries:
+            key, _ = self._entries.popitem(last=False)
+            evicted.append(key)
+        return evicted
+
+    def clear(self):
+        self._entries.clear()
+
+class SQLiteBackend:
+    def __init__(self, path: str = "support_cache.sqlite3", touch_batch_size: int = 64):
+        # One connection per cache, reused across calls and threads. Hits only
+        # update accessed_at (the LRU order); those updates are buffered and
+        # written together, in the next write transaction or every
+        # touch_batch_size hits, instead of a commit per hit.
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self.touch_batch_size = touch_batch_size
+        self._touched = {}
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS classification_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Tuple[Dict[str, str], float] | None:
+        row = self._conn.execute(
+            "SELECT value, created_at FROM classification_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        if len(self._touched) >= self.touch_batch_size:
+            self._write_touched()
+            self._conn.commit()
+        return json.loads(row[0]), row[1]
+
+    def _write_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE classification_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def set(self, key: str, value: Dict[str, str], created_at: float):
+        self._touched.pop(key, None)
+        self._write_touched()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO classification_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), created_at, time.time())
+        )
+        self._conn.commit()
+
+    def delete(self, key: str):
+        self._touched.pop(key, None)
+        self._conn.execute("DELETE FROM classification_cache WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def keys(self) -> List[str]:
+        self._write_touched()
+        self._conn.commit()
+        return [row[0] for row in self._conn.execute("SELECT key FROM classification_cache ORDER BY accessed_at")]
+
+    def evict(self, max_entries: int) -> List[str]:
+        self._write_touched()
+        evicted = [row[0] for row in self._conn.execute(
+            "SELECT key FROM classification_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?", (max_entries,)
+        )]
+        if evicted:
+            self._conn.executemany("DELETE FROM classification_cache WHERE key = ?", [(key,) for key in evicted])
+        self._conn.commit()
+        return evicted
+
+    def clear(self):
+        self._touched.clear()
+        self._conn.execute("DELETE FROM classification_cache")
+        self._conn.commit()
+
+# Embeddings of the cached keys for the semantic lookup, kept up to date
+# incrementally: a new key is embedded once and appended as a row, a removed
+# key only marks its row dead (it comes back if the key is cached again), and
+# dead rows are dropped once they make up half of the matrix.
+class _KeyIndex:
+    def __init__(self, keys: List[str]):
+        self.keys = list(keys)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.alive = np.ones(len(self.keys), dtype=bool)
+        self.matrix = embed(self.keys) if self.keys else None
+        self._pending = []
+
+    def add(self, key: str):
+        row = self.rows.get(key)
+        if row is not None:
+            self.alive[row] = True
+            return
+        self.rows[key] = len(self.keys)
+        self.keys.append(key)
+        self.alive = np.append(self.alive, True)
+        self._pending.append(key)
+
+    def remove(self, key: str):
+        row = self.rows.get(key)
+        if row is not None:
+            self.alive[row] = False
+
+    def _sync(self):
+        if self._pending:
+            rows = embed(self._pending)
+            self.matrix = rows if self.matrix is None else sparse.vstack([self.matrix, rows], format="csr")
+            self._pending = []
+        if len(self.keys) and np.count_nonzero(~self.alive) * 2 > len(self.keys):
+            live = np.flatnonzero(self.alive)
+            self.keys = [self.keys[row] for row in live]
+            self.rows = {key: row for row, key in enumerate(self.keys)}
+            self.alive = np.ones(len(self.keys), dtype=bool)
+            self.matrix = self.matrix[live] if len(live) else None
+
+    def nearest(self, key: str) -> Tuple[str, float] | None:
+        self._sync()
+        if self.matrix is None:
+            return None
+        scores = (self.matrix @ embed([key]).T).toarray().ravel()
+        scores[~self.alive] = -np.inf
+        best = int(np.argmax(scores))
+        return (self.keys[best], float(scores[best])) if self.alive[best] else None
+
+# Classification cache keyed on normalized query text. With a similarity
+# threshold set, a miss falls back to the most similar cached query
+# (hashed n-gram cosine) and reuses its classification.
+class ClassificationCache:
+    def __init__(self, backend=None, max_entries: int = 10000, ttl_seconds: float = 86400, similarity_threshold: float | None = None):
+        self.backend = backend or MemoryBackend()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        # Built from the backend on the first semantic lookup; only tracks
+        # this process's own sets after that
+        self._key_index = None
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _lookup(self, key: str) -> Dict[str, str] | None:
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        value, created_at = entry
+        if self._expired(created_at):
+            self.backend.delete(key)
+            if self._key_index is not None:
+                self._key_index.remove(key)
+            return None
+        return value
+
+    def _nearest_key(self, key: str) -> str | None:
+        if self._key_index is None:
+            self._key_index = _KeyIndex(self.backend.keys())
+        nearest = self._key_index.nearest(key)
+        if nearest is None or nearest[1] < self.similarity_threshold:
+            return None
+        return nearest[0]
+
+    def get(self, query: str) -> Tuple[Dict[str, str], str] | None:
+        # Returns (value, "exact" | "semantic") or None
+        key = normalize_query(query)
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value, "exact"
+            if self.similarity_threshold:
+                nearest = self._nearest_key(key)
+                value = self._lookup(nearest) if nearest is not None else None
+                if value is not None:
+                    self.semantic_hits += 1
+                    return value, "semantic"
+            self.misses += 1
+            return None
+
+    def set(self, query: str, value: Dict[str, str]):
+        key = normalize_query(query)
+        with self._lock:
+            self.backend.set(key, value, time.time())
+            evicted = self.backend.evict(self.max_entries)
+            self.evictions += len(evicted)
+            if self._key_index is not None:
+                self._key_index.add(key)
+                for evicted_key in evicted:
+                    self._key_index.remove(evicted_key)
+
+    def clear(self):
+        with self._lock:
+            self.backend.clear()
+            self._key_index = None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0
+            }
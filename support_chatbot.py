@@ -0,0 +1,828 @@
+import os
+import re
+import atexit
+import json
+import time
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from typing import TypedDict, Dict, List
+from langchain_core.prompts import ChatPromptTemplate
+from datetime import datetime
+from text_index import ExampleIndex
+from intent_classifier import IntentClassifier, detect_sentiment, extract_order_id as extract_order_id_locally
+from support_cache import ClassificationCache, MemoryBackend, SQLiteBackend
+from support_rules import RULE_ENGINE, needs_escalation
+from llm_gateway import LLMGateway, CircuitBreaker, LLMUnavailableError, TRANSIENT_ERRORS
+from session_store import MemorySessionStore, SQLiteSessionStore, FileSessionStore, StoreCheckpointer
+
+# Customer Support Chatbot Setup
+class State(TypedDict):
+    query: str
+    category: str
+    sentiment: str
+    response: str
+    order_id: str
+    needs_escalation: bool
+    session_id: str
+    conversation_history: List[Dict[str, str]]
+    history_summary: Dict
+    classification_source: str
+    escalated_to: str
+
+def create_dataset():
+    dataset = {
+        "queries": [
+            {"query": "What services do you offer?", "category": "General", "expected_response": "We offer a wide range of Aarong clothing, including traditional and modern apparel."},
+            {"query": "How can I place an order?", "category": "General", "expected_response": "Visit our website or app, select your clothing items, and follow the checkout process."},
+            {"query": "What are your operating hours?", "category": "General", "expected_response": "Our online store is available 24/7. Physical stores are open 10 AM to 8 PM."},
+            {"query": "How do I contact customer support?", "category": "General", "expected_response": "Use this chatbot, email support@aarong.com, or call +880-123-456-7890."},
+            {"query": "Where is your service available?", "category": "General", "expected_response": "Check delivery areas on our website's 'Shipping Info' section."},
+            {"query": "What are your terms and conditions?", "category": "General", "expected_response": "View our terms on the 'Terms' page of our website."},
+            {"query": "Why was my order delivered late?", "category": "Complaints", "expected_response": "Check tracking or escalate if no order ID."},
+            {"query": "I received the wrong item.", "category": "Complaints", "expected_response": "Initiate a return or replacement."},
+            {"query": "The product was damaged.", "category": "Complaints", "expected_response": "Initiate a return or refund."},
+            {"query": "The staff was rude.", "category": "Complaints", "expected_response": "File a complaint via website."},
+            {"query": "Why was my order canceled?", "category": "Complaints", "expected_response": "Escalate for investigation."},
+            {"query": "Why is delivery unavailable in my area?", "category": "Complaints", "expected_response": "Check service availability or escalate."},
+            {"query": "How do I request a refund?", "category": "Refunds", "expected_response": "Submit a refund request via website."},
+            {"query": "When will I receive my refund?", "category": "Refunds", "expected_response": "Provide refund processing details."},
+            {"query": "Why haven’t I received my refund?", "category": "Refunds", "expected_response": "Check refund status or escalate."},
+            {"query": "Can I get a refund for a defective product?", "category": "Refunds", "expected_response": "Initiate refund for poor quality."},
+            {"query": "Are delivery fees refundable?", "category": "Refunds", "expected_response": "Explain refund policy for fees."},
+            {"query": "What are the refund conditions?", "category": "Refunds", "expected_response": "Provide refund conditions."},
+            {"query": "Where is my order?", "category": "Delivery", "expected_response": "Track order on website."},
+            {"query": "Why is my delivery delayed?", "category": "Delivery", "expected_response": "Check tracking or offer discount."},
+            {"query": "The rider couldn’t find my address.", "category": "Delivery", "expected_response": "Update address or contact rider."},
+            {"query": "Can I change my delivery address?", "category": "Delivery", "expected_response": "Guide to change address."},
+            {"query": "What if I’m not available for delivery?", "category": "Delivery", "expected_response": "Explain delivery retry policy."},
+            {"query": "Delivery marked completed but not received.", "category": "Delivery", "expected_response": "Escalate for investigation."},
+            {"query": "Why was I charged incorrectly?", "category": "Payments", "expected_response": "Verify charge or escalate."},
+            {"query": "How do I pay using bKash?", "category": "Payments", "expected_response": "Guide on payment methods."},
+            {"query": "Why is my payment method declined?", "category": "Payments", "expected_response": "Troubleshoot payment issue."},
+            {"query": "Can I use multiple payment methods?", "category": "Payments", "expected_response": "Explain payment method policy."},
+            {"query": "Why was I charged extra fees?", "category": "Payments", "expected_response": "Explain fee structure."},
+            {"query": "How do I refund an overcharge?", "category": "Payments", "expected_response": "Guide to refund for overcharge."},
+            {"query": "How do I log into my account?", "category": "Account", "expected_response": "Guide to account creation/login."},
+            {"query": "How do I reset my password?", "category": "Account", "expected_response": "Reset password via website."},
+            {"query": "Why is my account locked?", "category": "Account", "expected_response": "Explain account status or escalate."},
+            {"query": "How do I update my account details?", "category": "Account", "expected_response": "Update details in profile."},
+            {"query": "Why can’t I access some features?", "category": "Account", "expected_response": "Troubleshoot account access."},
+            {"query": "How do I delete my account?", "category": "Account", "expected_response": "Guide to account deletion."},
+            {"query": "How do I apply a promo code?", "category": "Promotions", "expected_response": "Guide to apply promo code."},
+            {"query": "Why isn’t my promo code working?", "category": "Promotions", "expected_response": "Troubleshoot promo code issue."},
+            {"query": "What are the promo terms?", "category": "Promotions", "expected_response": "Provide promotion terms."},
+            {"query": "Can I use multiple vouchers?", "category": "Promotions", "expected_response": "Explain voucher stacking policy."},
+            {"query": "Am I eligible for a discount?", "category": "Promotions", "expected_response": "Check promotion eligibility."},
+            {"query": "Why was my discount not applied?", "category": "Promotions", "expected_response": "Investigate cashback issue."},
+            {"query": "I need a live agent.", "category": "Escalation", "expected_response": "Escalate to live agent."},
+            {"query": "The chatbot didn’t help.", "category": "Escalation", "expected_response": "Escalate to live agent."},
+            {"query": "How long for a representative to respond?", "category": "Escalation", "expected_response": "Provide response time estimate."}
+        ],
+        "agents": [
+            {"name": "Agent John", "contact_number": "+880-1234-567890", "specialty": "Complaints, Refunds"},
+            {"name": "Agent Sarah", "contact_number": "+880-9876-543210", "specialty": "Delivery, Payments"},
+            {"name": "Agent Ayesha", "contact_number": "+880-5555-123456", "specialty": "Account, Promotions, General, Escalation"}
+        ]
+    }
+    with open("support_dataset.json", "w") as f:
+        json.dump(dataset, f, indent=4)
+    return dataset
+
+# Process-wide dataset cache, reloaded when the file's mtime changes
+_dataset_cache = {"mtime": None, "dataset": None, "agents_by_specialty": {}, "example_index": None, "intent_classifier": None}
+_dataset_lock = threading.Lock()
+
+def _load_support_data() -> dict:
+    if not os.path.exists("support_dataset.json"):
+        create_dataset()
+    mtime = os.path.getmtime("support_dataset.json")
+    with _dataset_lock:
+        if _dataset_cache["mtime"] != mtime:
+            with open("support_dataset.json", "r") as f:
+                dataset = json.load(f)
+            agents_by_specialty = {}
+            for agent in dataset["agents"]:
+                for specialty in agent["specialty"].split(","):
+                    agents_by_specialty.setdefault(specialty.strip().lower(), agent)
+            example_index = ExampleIndex(dataset["queries"])
+            _dataset_cache.update(
+                mtime=mtime,
+                dataset=dataset,
+                agents_by_specialty=agents_by_specialty,
+                example_index=example_index,
+                intent_classifier=IntentClassifier(example_index)
+            )
+        return dict(_dataset_cache)
+
+def load_dataset():
+    return _load_support_data()["dataset"]
+
+# Number of most similar dataset queries put in classification prompts; 0 sends the whole dataset
+FEW_SHOT_EXAMPLES = int(os.getenv("SUPPORT_FEW_SHOT_EXAMPLES", "8"))
+
+def select_examples(query: str) -> List[Dict[str, str]]:
+    support_data = _load_support_data()
+    if FEW_SHOT_EXAMPLES <= 0:
+        return support_data["dataset"]["queries"]
+    return [example for example, _ in support_data["example_index"].search(query, FEW_SHOT_EXAMPLES)]
+
+# Local classifier confidence at or above which the LLM is skipped; above 1 disables the fast path
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv("SUPPORT_LOCAL_THRESHOLD", "0.6"))
+
+def classify_fallback(query: str) -> State:
+    # Used when the LLM is unavailable: the local classifier's best guess at any confidence
+    result = _load_support_data()["intent_classifier"].classify(query)
+    return {
+        "category": result["category"] or "General",
+        "sentiment": result["sentiment"],
+        "order_id": result["order_id"],
+        "classification_source": "fallback"
+    }
+
+def classify_locally(query: str) -> State | None:
+    result = _load_support_data()["intent_classifier"].classify(query)
+    if result["category"] is None or result["confidence"] < LOCAL_CLASSIFIER_THRESHOLD:
+        return None
+    return {
+        "category": result["category"],
+        "sentiment": result["sentiment"],
+        "order_id": result["order_id"],
+        "classification_source": "local"
+    }
+
+# Classification cache: SUPPORT_CACHE_BACKEND is "memory", "sqlite" or "off";
+# SUPPORT_CACHE_SIMILARITY > 0 also reuses results of similar cached queries
+@lru_cache(maxsize=None)
+def get_classification_cache() -> ClassificationCache | None:
+    backend_name = os.getenv("SUPPORT_CACHE_BACKEND", "memory")
+    if backend_name == "off":
+        return None
+    if backend_name == "sqlite":
+        backend = SQLiteBackend(os.getenv("SUPPORT_CACHE_PATH", "support_cache.sqlite3"))
+    else:
+        backend = MemoryBackend()
+    similarity = float(os.getenv("SUPPORT_CACHE_SIMILARITY", "0"))
+    return ClassificationCache(
+        backend,
+        max_entries=int(os.getenv("SUPPORT_CACHE_SIZE", "10000")),
+        ttl_seconds=float(os.getenv("SUPPORT_CACHE_TTL", "86400")),
+        similarity_threshold=similarity or None
+    )
+
+# Session checkpoints: SUPPORT_SESSION_BACKEND is "memory", "sqlite", "file" or
+# "off". With sqlite or file, sessions survive restarts and can be shared by
+# replicas pointing at the same path.
+# By default every turn is flushed when it ends: the supersteps of a turn
+# collapse into one write, but writes are not batched across sessions, so a
+# finished turn is durable and visible to other replicas at once. With
+# SUPPORT_SESSION_WRITE_BEHIND=1 turns are not flushed individually; a
+# background thread writes the checkpoints of all sessions together every
+# SUPPORT_SESSION_FLUSH_INTERVAL seconds (or per SUPPORT_SESSION_BATCH_SIZE
+# sessions), at the cost of losing up to that interval of turns in a crash
+# and of replicas seeing them late.
+SESSION_WRITE_BEHIND = os.getenv("SUPPORT_SESSION_WRITE_BEHIND", "0") == "1"
+
+@lru_cache(maxsize=None)
+def get_session_store():
+    backend_name = os.getenv("SUPPORT_SESSION_BACKEND", "memory")
+    if backend_name == "off":
+        return None
+    options = {
+        "ttl_seconds": float(os.getenv("SUPPORT_SESSION_TTL", str(7 * 24 * 3600))),
+        "batch_size": int(os.getenv("SUPPORT_SESSION_BATCH_SIZE", "32")),
+        "flush_interval": float(os.getenv("SUPPORT_SESSION_FLUSH_INTERVAL", "1.0")),
+        "expire_every": int(os.getenv("SUPPORT_SESSION_EXPIRE_EVERY", "100")),
+        "background_flush": SESSION_WRITE_BEHIND
+    }
+    if backend_name == "sqlite":
+        store = SQLiteSessionStore(os.getenv("SUPPORT_SESSION_PATH", "support_sessions.sqlite3"), **options)
+    elif backend_name == "file":
+        store = FileSessionStore(os.getenv("SUPPORT_SESSION_PATH", "support_sessions"), **options)
+    else:
+        store = MemorySessionStore(**options)
+    store.expire()
+    if SESSION_WRITE_BEHIND:
+        atexit.register(store.close)
+    return store
+
+def classify_without_llm(query: str) -> State | None:
+    cache = get_classification_cache()
+    cached = cache.get(query) if cache is not None else None
+    if cached:
+        value, match = cached
+        # A similar query's order id belongs to someone else's order
+        order_id = value["order_id"] if match == "exact" else extract_order_id_locally(query)
+        return {
+            "category": value["category"],
+            "sentiment": value["sentiment"],
+            "order_id": order_id,
+            "classification_source": "cache"
+        }
+    return classify_locally(query)
+
+def remember_classification(state: State):
+    cache = get_classification_cache()
+    if cache is not None and state.get("classification_source") in ("llm", "batch"):
+        cache.set(state["query"], {
+            "category": state["category"],
+            "sentiment": state.get("sentiment", "Neutral"),
+            "order_id": state.get("order_id", "None")
+        })
+
+def find_agent(specialty: str) -> Dict[str, str]:
+    support_data = _load_support_data()
+    agent = support_data["agents_by_specialty"].get(specialty.strip().lower())
+    return agent or support_data["dataset"]["agents"][0]
+
+def handle_default_query(query: str) -> tuple[str, bool]:
+    query_lower = query.lower().strip()
+    if query_lower in ["hi", "hello", "hey"]:
+        return "Hello! How can I assist you today?", False
+    elif query_lower in ["bye", "goodbye", "thank you", "thanks"]:
+        return "Thank you for reaching out! Have a great day!", False
+    return None, False
+
+# "fused" classifies category, sentiment and order id in one LLM call;
+# "parallel" categorizes first, then runs sentiment and order id concurrently;
+# "sequential" keeps the original three-call chain
+CLASSIFICATION_MODE = os.getenv("SUPPORT_CLASSIFICATION_MODE", "fused")
+_llm_override = None
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def set_llm(llm):
+    # Swap in another chat model (e.g. a stub for offline tests); None restores the default
+    global _llm_override, _gateway
+    _llm_override = llm
+    _gateway = None
+
+def get_llm():
+    if _llm_override is not None:
+        return _llm_override
+    return _default_llm()
+
+# LLM gateway limits: SUPPORT_LLM_CONCURRENCY concurrent calls, SUPPORT_LLM_TIMEOUT
+# seconds per attempt, SUPPORT_LLM_RETRIES retries; the breaker opens after
+# SUPPORT_LLM_BREAKER_FAILURES failed calls for SUPPORT_LLM_BREAKER_RESET seconds.
+# GROQ_API_BASE points the client at another server (e.g. a local fake).
+LLM_CONCURRENCY = int(os.getenv("SUPPORT_LLM_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("SUPPORT_LLM_TIMEOUT", "20"))
+LLM_RETRIES = int(os.getenv("SUPPORT_LLM_RETRIES", "2"))
+
+@lru_cache(maxsize=None)
+def _default_llm():
+    # Built on first use so pages that never chat don't pay for the client
+    import httpx
+    from langchain_groq import ChatGroq
+    # One pooled keep-alive client per process; the gateway owns retries
+    limits = httpx.Limits(max_connections=LLM_CONCURRENCY, max_keepalive_connections=LLM_CONCURRENCY)
+    return ChatGroq(
+        temperature=0,
+        groq_api_key=os.getenv("GROQ_API_KEY"),
+        model_name="llama-3.3-70b-versatile",
+        timeout=LLM_TIMEOUT,
+        max_retries=0,
+        http_client=httpx.Client(limits=limits, timeout=LLM_TIMEOUT),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=LLM_TIMEOUT)
+    )
+
+def _transient_errors() -> tuple:
+    # Connection-level failures of the Groq client; HTTP status errors are
+    # judged by their code in llm_gateway.is_retryable
+    if _llm_override is not None:
+        return TRANSIENT_ERRORS
+    import httpx
+    import groq
+    return TRANSIENT_ERRORS + (httpx.TransportError, groq.APIConnectionError)
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(
+                get_llm(),
+                max_concurrency=LLM_CONCURRENCY,
+                timeout=LLM_TIMEOUT,
+                max_retries=LLM_RETRIES,
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("SUPPORT_LLM_BREAKER_FAILURES", "5")),
+                    reset_timeout=float(os.getenv("SUPPORT_LLM_BREAKER_RESET", "30"))
+                ),
+                transient_errors=_transient_errors()
+            )
+        return _gateway
+
+def ask_llm(prompt: ChatPromptTemplate, inputs: Dict[str, str]) -> str:
+    # Raises LLMUnavailableError when the call times out, keeps failing or the breaker is open
+    return get_gateway().invoke(prompt.invoke(inputs)).content
+
+def llm_metrics() -> Dict[str, float]:
+    return get_gateway().metrics()
+
+def categorize(state: State) -> State:
+    if state.get("classification_source") not in (None, "default"):
+        # Classified before the graph ran (see classify_batch)
+        return {"classification_source": state["classification_source"]}
+    default_response, needs_escalation = handle_default_query(state["query"])
+    if default_response:
+        return {
+            "response": default_response,
+            "category": "Default",
+            "needs_escalation": needs_escalation,
+            "sentiment": "Neutral",
+            "order_id": "None"
+        }
+    fast_result = classify_without_llm(state["query"])
+    if fast_result:
+        return fast_result
+    return categorize_with_llm(state["query"])
+
+def categorize_with_llm(query: str) -> State:
+    # The LLM step of categorize, without the default-reply, local and cache checks
+    prompt = ChatPromptTemplate.from_template(
+        "Given the following dataset of queries:\n{dataset}\n"
+        "Categorize the following customer query into one of these categories: Complaints, Refunds, Delivery, Payments, Account, Promotions, General, Escalation, Default. "
+        "Query: {query}"
+    )
+    dataset_str = json.dumps(select_examples(query), indent=2)
+    try:
+        category = ask_llm(prompt, {"query": query, "dataset": dataset_str})
+    except LLMUnavailableError:
+        return classify_fallback(query)
+    return {"category": category, "classification_source": "llm"}
+
+def analyze_sentiment(state: State) -> State:
+    if state["category"] == "Default":
+        return {"sentiment": "Neutral"}
+    if state.get("classification_source") in ("local", "cache", "fallback", "batch"):
+        return {"sentiment": state["sentiment"]}
+    prompt = ChatPromptTemplate.from_template(
+        "Analyze the sentiment of the following customer query. Respond with either 'Positive', 'Neutral', or 'Negative'. Query: {query}"
+    )
+    try:
+        sentiment = ask_llm(prompt, {"query": state["query"]})
+    except LLMUnavailableError:
+        sentiment = detect_sentiment(state["query"])
+    return {"sentiment": sentiment}
+
+def extract_order_id(state: State) -> State:
+    if state["category"] == "Default":
+        return {"order_id": "None"}
+    if state.get("classification_source") in ("local", "cache", "fallback", "batch"):
+        return {"order_id": state["order_id"]}
+    prompt = ChatPromptTemplate.from_template(
+        "If the following query contains an order ID, extract and return it. If no order ID is present, return 'None'. Query: {query}"
+    )
+    try:
+        order_id = ask_llm(prompt, {"query": state["query"]})
+    except LLMUnavailableError:
+        order_id = extract_order_id_locally(state["query"])
+    return {"order_id": order_id}
+
+def parse_classification(content: str) -> Dict[str, str] | None:
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    if not match:
+        return None
+    try:
+        parsed = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(parsed, dict) or not parsed.get("category"):
+        return None
+    sentiment = str(parsed.get("sentiment", "Neutral"))
+    sentiment = next((s for s in ["Positive", "Neutral", "Negative"] if s.lower() in sentiment.lower()), "Neutral")
+    order_id = parsed.get("order_id")
+    return {
+        "category": str(parsed["category"]),
+        "sentiment": sentiment,
+        "order_id": str(order_id) if order_id not in (None, "", "null") else "None"
+    }
+
+def classify(state: State) -> State:
+    if state.get("classification_source") not in (None, "default"):
+        # Classified before the graph ran (see classify_batch)
+        return {"classification_source": state["classification_source"]}
+    default_response, needs_escalation = handle_default_query(state["query"])
+    if default_response:
+        return {
+            "response": default_response,
+            "category": "Default",
+            "needs_escalation": needs_escalation,
+            "sentiment": "Neutral",
+            "order_id": "None"
+        }
+    fast_result = classify_without_llm(state["query"])
+    if fast_result:
+        return fast_result
+    prompt = ChatPromptTemplate.from_template(
+        "Given the following dataset of queries:\n{dataset}\n"
+        "Classify the following customer query. Respond with only a JSON object with these keys: "
+        "\"category\" (one of Complaints, Refunds, Delivery, Payments, Account, Promotions, General, Escalation, Default), "
+        "\"sentiment\" (one of Positive, Neutral, Negative) and "
+        "\"order_id\" (the order ID contained in the query, or \"None\"). "
+        "Query: {query}"
+    )
+    dataset_str = json.dumps(select_examples(state["query"]), indent=2)
+    try:
+        parsed = parse_classification(ask_llm(prompt, {"query": state["query"], "dataset": dataset_str}))
+    except LLMUnavailableError:
+        return classify_fallback(state["query"])
+    if parsed is not None:
+        result = {**parsed, "classification_source": "llm"}
+        remember_classification({**state, **result})
+        return result
+    # Unparseable structured output: fall back to the three-call path; the
+    # default-reply, local and cache checks above already ran for this query
+    result = categorize_with_llm(state["query"])
+    merged = {**state, **result}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sentiment = executor.submit(analyze_sentiment, merged)
+        order_id = executor.submit(extract_order_id, merged)
+        result.update(sentiment.result())
+        result.update(order_id.result())
+    remember_classification({**state, **result})
+    return result
+
+# Queries per classify_batch LLM call; the reply grows with the batch
+CLASSIFY_BATCH_SIZE = int(os.getenv("SUPPORT_CLASSIFY_BATCH_SIZE", "16"))
+
+def classify_batch(queries: List[str]) -> List[State | None]:
+    # Classifies many queries with one LLM call per CLASSIFY_BATCH_SIZE of
+    # them. Cached and confident local results are used as they are; the
+    # rest are numbered in a single prompt that answers with a JSON array.
+    # Greetings, queries the reply does not cover and LLM failures give
+    # None, and the graph then classifies those queries one by one.
+    results = [None if handle_default_query(query)[0] else classify_without_llm(query) for query in queries]
+    todo = [i for i, query in enumerate(queries) if results[i] is None and not handle_default_query(query)[0]]
+    prompt = ChatPromptTemplate.from_template(
+        "Given the following dataset of queries:\n{dataset}\n"
+        "Classify each of the numbered customer queries below. Respond with only a JSON array holding one object per query with these keys: "
+        "\"id\" (the query number), "
+        "\"category\" (one of Complaints, Refunds, Delivery, Payments, Account, Promotions, General, Escalation, Default), "
+        "\"sentiment\" (one of Positive, Neutral, Negative) and "
+        "\"order_id\" (the order ID contained in the query, or \"None\").\n"
+        "Queries:\n{queries}"
+    )
+    for start in range(0, len(todo), CLASSIFY_BATCH_SIZE):
+        chunk = todo[start:start + CLASSIFY_BATCH_SIZE]
+        examples = {}
+        for i in chunk:
+            for example in select_examples(queries[i]):
+                examples.setdefault(example["query"], example)
+        numbered = "\n".join(f"{number}. {queries[i]}" for number, i in enumerate(chunk, 1))
+        try:
+            content = ask_llm(prompt, {"queries": numbered, "dataset": json.dumps(list(examples.values()), indent=2)})
+        except LLMUnavailableError:
+            continue
+        match = re.search(r"\[.*\]", content, re.DOTALL)
+        try:
+            items = json.loads(match.group(0)) if match else []
+        except json.JSONDecodeError:
+            items = []
+        for item in items if isinstance(items, list) else []:
+            number = item.get("id") if isinstance(item, dict) else None
+            if not isinstance(number, int) or not 1 <= number <= len(chunk):
+                continue
+            parsed = parse_classification(json.dumps(item))
+            if parsed is not None:
+                i = chunk[number - 1]
+                results[i] = {**parsed, "classification_source": "batch"}
+                remember_classification({"query": queries[i], **results[i]})
+    return results
+
+def join_classification(state: State) -> State:
+    # Fan-in point for the sentiment / order id branches
+    remember_classification(state)
+    return {"category": state["category"]}
+
+# Per-session history cap: the most recent turns are kept verbatim, older
+# ones are folded into a compact summary; long messages are truncated
+MAX_HISTORY_TURNS = int(os.getenv("SUPPORT_HISTORY_TURNS", "50"))
+MAX_MESSAGE_CHARS = int(os.getenv("SUPPORT_HISTORY_MAX_CHARS", "2000"))
+
+def _truncate(text: str) -> str:
+    return text if len(text) <= MAX_MESSAGE_CHARS else text[:MAX_MESSAGE_CHARS - 1] + "…"
+
+def compact_history(history: List[Dict[str, str]], summary: Dict | None, max_turns: int = None) -> tuple[List[Dict[str, str]], Dict | None]:
+    max_turns = MAX_HISTORY_TURNS if max_turns is None else max_turns
+    overflow = len(history) - max_turns
+    if overflow <= 0:
+        return history, summary
+    older, recent = history[:overflow], history[overflow:]
+    summary = {
+        "turns": 0,
+        "categories": {},
+        "first_timestamp": older[0].get("timestamp"),
+        **(summary or {})
+    }
+    summary["categories"] = dict(summary["categories"])
+    for turn in older:
+        category = turn.get("category", "Unknown")
+        summary["categories"][category] = summary["categories"].get(category, 0) + 1
+    summary["turns"] += len(older)
+    summary["last_timestamp"] = older[-1].get("timestamp")
+    return recent, summary
+
+def update_conversation_history(state: State) -> State:
+    if not state.get("response"):
+        return state
+    history = list(state.get("conversation_history") or [])
+    history.append({
+        "query": _truncate(state["query"]),
+        "response": _truncate(state["response"]),
+        "category": state.get("category", "Unknown"),
+        "timestamp": str(datetime.now())
+    })
+    history, summary = compact_history(history, state.get("history_summary"))
+    return {"conversation_history": history, "history_summary": summary}
+
+def _apply_rules(category: str, state: State) -> State:
+    rule = RULE_ENGINE.match(category, state["query"])
+    order_id = state.get("order_id", "None")
+    context = {"order_id": order_id}
+    if "{agent_" in rule["response"]:
+        agent = find_agent("escalation")
+        context.update(agent_name=agent["name"], agent_specialty=agent["specialty"], agent_contact=agent["contact_number"])
+    return {
+        "response": rule["response"].format(**context),
+        "needs_escalation": needs_escalation(rule["escalation"], state["sentiment"], order_id)
+    }
+
+def handle_complaints(state: State) -> State:
+    return _apply_rules("Complaints", state)
+
+def handle_refunds(state: State) -> State:
+    return _apply_rules("Refunds", state)
+
+def handle_delivery(state: State) -> State:
+    return _apply_rules("Delivery", state)
+
+def handle_payments(state: State) -> State:
+    return _apply_rules("Payments", state)
+
+def handle_account(state: State) -> State:
+    return _apply_rules("Account", state)
+
+def handle_promotions(state: State) -> State:
+    return _apply_rules("Promotions", state)
+
+def handle_general(state: State) -> State:
+    return _apply_rules("General", state)
+
+def handle_escalation(state: State) -> State:
+    return _apply_rules("Escalation", state)
+
+def escalate(state: State) -> State:
+    agent = find_agent(state["category"])
+    response = (
+        f"Your query has been escalated to {agent['name']} (specialty: {agent['specialty']}). "
+        f"Please contact them at {agent['contact_number']} with your order ID and details."
+    )
+    return {"response": response, "needs_escalation": False, "escalated_to": agent["name"]}
+
+def route_query(state: State) -> str:
+    if state.get("needs_escalation", False) or state["query"].lower().find("live agent") != -1:
+        return "escalate"
+    if state["category"] == "Default":
+        return "update_conversation_history"
+    category = state["category"].lower()
+    if "complaints" in category:
+        return "handle_complaints"
+    elif "refunds" in category:
+        return "handle_refunds"
+    elif "delivery" in category:
+        return "handle_delivery"
+    elif "payments" in category:
+        return "handle_payments"
+    elif "account" in category:
+        return "handle_account"
+    elif "promotions" in category:
+        return "handle_promotions"
+    elif "escalation" in category:
+        return "handle_escalation"
+    else:
+        return "handle_general"
+
+# Wall-clock seconds of the most recent runs of each graph node
+_node_timings = defaultdict(lambda: deque(maxlen=1000))
+_node_timings_lock = threading.Lock()
+
+def _timed(name: str, node):
+    @wraps(node)
+    def wrapper(state: State) -> State:
+        start = time.perf_counter()
+        try:
+            return node(state)
+        finally:
+            with _node_timings_lock:
+                _node_timings[name].append(time.perf_counter() - start)
+    return wrapper
+
+def node_timings() -> Dict[str, Dict[str, float]]:
+    with _node_timings_lock:
+        snapshot = {name: list(durations) for name, durations in _node_timings.items()}
+    return {
+        name: {
+            "count": len(durations),
+            "mean_ms": 1000 * sum(durations) / len(durations),
+            "max_ms": 1000 * max(durations)
+        }
+        for name, durations in snapshot.items() if durations
+    }
+
+def reset_node_timings():
+    with _node_timings_lock:
+        _node_timings.clear()
+
+@lru_cache(maxsize=None)
+def get_app(mode: str | None = None, checkpointed: bool = True):
+    # checkpointed=False compiles without the session store, for one-off runs
+    # such as batch triage that have no conversation to resume
+    from langgraph.graph import StateGraph, END
+    mode = mode or CLASSIFICATION_MODE
+    workflow = StateGraph(State)
+
+    def add_node(name, node):
+        workflow.add_node(name, _timed(name, node))
+
+    if mode == "fused":
+        add_node("classify", classify)
+        workflow.set_entry_point("classify")
+        classification_exit = "classify"
+    elif mode == "parallel":
+        add_node("categorize", categorize)
+        add_node("analyze_sentiment", analyze_sentiment)
+        add_node("extract_order_id", extract_order_id)
+        add_node("join_classification", join_classification)
+        workflow.set_entry_point("categorize")
+        workflow.add_edge("categorize", "analyze_sentiment")
+        workflow.add_edge("categorize", "extract_order_id")
+        workflow.add_edge(["analyze_sentiment", "extract_order_id"], "join_classification")
+        classification_exit = "join_classification"
+    else:
+        add_node("categorize", categorize)
+        add_node("analyze_sentiment", analyze_sentiment)
+        add_node("extract_order_id", extract_order_id)
+        add_node("join_classification", join_classification)
+        workflow.set_entry_point("categorize")
+        workflow.add_edge("categorize", "analyze_sentiment")
+        workflow.add_edge("analyze_sentiment", "extract_order_id")
+        workflow.add_edge("extract_order_id", "join_classification")
+        classification_exit = "join_classification"
+    add_node("update_conversation_history", update_conversation_history)
+    add_node("handle_complaints", handle_complaints)
+    add_node("handle_refunds", handle_refunds)
+    add_node("handle_delivery", handle_delivery)
+    add_node("handle_payments", handle_payments)
+    add_node("handle_account", handle_account)
+    add_node("handle_promotions", handle_promotions)
+    add_node("handle_general", handle_general)
+    add_node("handle_escalation", handle_escalation)
+    add_node("escalate", escalate)
+    workflow.add_conditional_edges(
+        classification_exit,
+        route_query,
+        {
+            "handle_complaints": "handle_complaints",
+            "handle_refunds": "handle_refunds",
+            "handle_delivery": "handle_delivery",
+            "handle_payments": "handle_payments",
+            "handle_account": "handle_account",
+            "handle_promotions": "handle_promotions",
+            "handle_general": "handle_general",
+            "handle_escalation": "handle_escalation",
+            "escalate": "escalate",
+            "update_conversation_history": "update_conversation_history"
+        }
+    )
+    workflow.add_conditional_edges(
+        "handle_complaints",
+        lambda state: "escalate" if state["needs_escalation"] else "update_conversation_history",
+        {"escalate": "escalate", "update_conversation_history": "update_conversation_history"}
+    )
+    workflow.add_conditional_edges(
+        "handle_refunds",
+        lambda state: "escalate" if state["needs_escalation"] else "update_conversation_history",
+        {"escalate": "escalate", "update_conversation_history": "update_conversation_history"}
+    )
+    workflow.add_conditional_edges(
+        "handle_delivery",
+        lambda state: "escalate" if state["needs_escalation"] else "update_conversation_history",
+        {"escalate": "escalate", "update_conversation_history": "update_conversation_history"}
+    )
+    workflow.add_conditional_edges(
+        "handle_payments",
+        lambda state: "escalate" if state["needs_escalation"] else "update_conversation_history",
+        {"escalate": "escalate", "update_conversation_history": "update_conversation_history"}
+    )
+    workflow.add_conditional_edges(
+        "handle_account",
+        lambda state: "escalate" if state["needs_escalation"] else "update_conversation_history",
+        {"escalate": "escalate", "update_conversation_history": "update_conversation_history"}
+    )
+    workflow.add_conditional_edges(
+        "handle_promotions",
+        lambda state: "escalate" if state["needs_escalation"] else "update_conversation_history",
+        {"escalate": "escalate", "update_conversation_history": "update_conversation_history"}
+    )
+    workflow.add_conditional_edges(
+        "handle_general",
+        lambda state: "escalate" if state["needs_escalation"] else "update_conversation_history",
+        {"escalate": "escalate", "update_conversation_history": "update_conversation_history"}
+    )
+    workflow.add_conditional_edges(
+        "handle_escalation",
+        lambda state: "escalate" if state["needs_escalation"] else "update_conversation_history",
+        {"escalate": "escalate", "update_conversation_history": "update_conversation_history"}
+    )
+    workflow.add_edge("escalate", "update_conversation_history")
+    workflow.add_edge("update_conversation_history", END)
+    store = get_session_store() if checkpointed else None
+    return workflow.compile(checkpointer=StoreCheckpointer(store) if store is not None else None)
+
+def _session_config(session_id: str) -> Dict:
+    return {"configurable": {"thread_id": session_id}}
+
+def support_input(query: str, session_id: str, conversation_history: List[Dict[str, str]] | None, history_summary: Dict | None = None, classification: State | None = None) -> State:
+    # Graph input for one turn. Per-turn keys are reset so values
+    # checkpointed by the previous turn do not leak into this one; a
+    # classification made ahead of the graph (classify_batch) is passed in
+    state = {
+        "query": query,
+        "response": "",
+        "sentiment": "Neutral",
+        "order_id": "None",
+        "needs_escalation": False,
+        "session_id": session_id,
+        "classification_source": "default",
+        "escalated_to": "None",
+        **(classification or {})
+    }
+    # With conversation_history=None the checkpointed history is continued
+    if conversation_history is not None or get_session_store() is None:
+        state["conversation_history"] = conversation_history or []
+        state["history_summary"] = history_summary
+    return state
+
+def support_output(result: State) -> Dict[str, str]:
+    # The fields callers (chat UI, batch triage) read from a finished graph run
+    return {
+        "category": result["category"],
+        "sentiment": result.get("sentiment", "Neutral"),
+        "response": result["response"],
+        "order_id": result["order_id"],
+        "session_id": result["session_id"],
+        "conversation_history": result["conversation_history"],
+        "history_summary": result.get("history_summary"),
+        "classification_source": result.get("classification_source", "default"),
+        "escalated_to": result.get("escalated_to") or "None"
+    }
+
+def load_session(session_id: str) -> Dict:
+    # Returns the checkpointed history of a session (empty if unknown or expired)
+    empty = {"conversation_history": [], "history_summary": None}
+    if get_session_store() is None:
+        return empty
+    values = get_app().get_state(_session_config(session_id)).values
+    return {
+        "conversation_history": values.get("conversation_history", []),
+        "history_summary": values.get("history_summary")
+    }
+
+def _flush_session():
+    # One store write per turn: the checkpoints of every superstep of the
+    # turn collapse into the last one (see SESSION_WRITE_BEHIND)
+    store = get_session_store()
+    if store is not None and not SESSION_WRITE_BEHIND:
+        store.flush()
+
+def run_customer_support(query: str, session_id: str, conversation_history: List[Dict[str, str]] | None = None, history_summary: Dict | None = None) -> Dict[str, str]:
+    result = get_app().invoke(support_input(query, session_id, conversation_history, history_summary), _session_config(session_id))
+    _flush_session()
+    return support_output(result)
+
+async def astream_customer_support(query: str, session_id: str, conversation_history: List[Dict[str, str]] | None = None, history_summary: Dict | None = None):
+    # Yields {"type": "node", "node"}, {"type": "token", "node", "text"} while the
+    # graph runs, then {"type": "result", "result", "first_token_s", "total_s"}
+    start = time.perf_counter()
+    first_token_s = None
+    async for event in get_app().astream_events(support_input(query, session_id, conversation_history, history_summary), _session_config(session_id), version="v2"):
+        node = event.get("metadata", {}).get("langgraph_node")
+        if event["event"] == "on_chain_start" and event["name"] == node and len(event.get("parent_ids", [])) == 1:
+            yield {"type": "node", "node": node}
+        elif event["event"] == "on_chat_model_stream":
+            text = event["data"]["chunk"].content
+            if text:
+                if first_token_s is None:
+                    first_token_s = time.perf_counter() - start
+                yield {"type": "token", "node": node, "text": text}
+        elif event["event"] == "on_chain_end" and not event.get("parent_ids"):
+            _flush_session()
+            yield {
+                "type": "result",
+                "result": support_output(event["data"]["output"]),
+                "first_token_s": first_token_s,
+                "total_s": time.perf_counter() - start
+            }
@@ -0,0 +1,341 @@
+import re
+from typing import Dict, List
+
+# Declarative response rules for the category handlers. Within a category
+# the first rule whose "when" groups are all satisfied wins; each group is a
+# list of alternative phrases, any of which must appear in the lowercased
+# query. A rule with no groups is the category fallback.
+RULES = {
+    "Complaints": [
+        {
+            "when": [["late", "not delivered"]],
+            "response": "We're sorry for the issue with your order (Order ID: {order_id}). Please check the tracking details on our website using your order ID. As a gesture of goodwill, we've applied a 10% discount code (DELAY10) to your next order.",
+            "escalation": "negative_without_order"
+        },
+        {
+            "when": [["wrong item", "incomplete"]],
+            "response": "We apologize for receiving the wrong or incomplete order (Order ID: {order_id}). Please initiate a return or replacement via the 'Returns' section on our website with your order ID.",
+            "escalation": "negative_without_order"
+        },
+        {
+            "when": [["damaged", "stale", "poor quality"]],
+            "response": "We apologize for the poor quality of your order (Order ID: {order_id}). Please report this via the 'Returns' section on our website to initiate a refund or replacement.",
+            "escalation": "negative_without_order"
+        },
+        {
+            "when": [["rude", "unprofessional"]],
+            "response": "We're sorry for your experience with our service provider. Please file a complaint via the 'Support' section on our website, and we'll investigate promptly.",
+            "escalation": "always"
+        },
+        {
+            "when": [["canceled without notification"]],
+            "response": "We apologize for the cancellation of your order (Order ID: {order_id}) without notification. This issue requires further investigation.",
+            "escalation": "always"
+        },
+        {
+            "when": [["service unavailable"]],
+            "response": "We're sorry, our service is currently unavailable in your area. Please check the 'Service Areas' section on our website for updates on expansion.",
+            "escalation": "negative"
+        },
+        {
+            "when": [],
+            "response": "We apologize for the issue with your order (Order ID: {order_id}). Please provide more details about your complaint to assist you better.",
+            "escalation": "always"
+        }
+    ],
+    "Refunds": [
+        {
+            "when": [["canceled", "undelivered"]],
+            "response": "To request a refund for your canceled or undelivered order (Order ID: {order_id}), visit the 'Refund' section on our website and submit a request with your order ID. Refunds are processed within 3-5 business days.",
+            "escalation": "negative_without_order"
+        },
+        {
+            "when": [["when will i receive my refund", "how will it be processed"]],
+            "response": "Refunds for Order ID: {order_id} are processed within 3-5 business days via the original payment method (e.g., bKash, bank transfer) or as a voucher, depending on your preference.",
+            "escalation": "never"
+        },
+        {
+            "when": [["haven’t received my refund"]],
+            "response": "We're sorry for the delay in processing your refund (Order ID: {order_id}). Please check the 'Refund Status' section on our website or provide more details for assistance.",
+            "escalation": "negative"
+        },
+        {
+            "when": [["poor quality"]],
+            "response": "For a refund due to poor quality (Order ID: {order_id}), please submit a request via the 'Refund' section on our website with details and photos of the issue.",
+            "escalation": "negative_without_order"
+        },
+        {
+            "when": [["delivery fees", "tips refundable"]],
+            "response": "Delivery fees and tips are refundable only if the order was not delivered or canceled before dispatch (Order ID: {order_id}). Please check our refund policy on the website.",
+            "escalation": "never"
+        },
+        {
+            "when": [["conditions"]],
+            "response": "Refunds are available for canceled, undelivered, or poor-quality orders (Order ID: {order_id}). Please review our refund policy in the 'Support' section on our website.",
+            "escalation": "never"
+        },
+        {
+            "when": [],
+            "response": "To request a refund (Order ID: {order_id}), visit the 'Refund' section on our website and follow the instructions.",
+            "escalation": "negative"
+        }
+    ],
+    "Delivery": [
+        {
+            "when": [["where is my order", "track"]],
+            "response": "To track your order (Order ID: {order_id}), visit the 'Track Order' section on our website or app for real-time updates.",
+            "escalation": "negative_without_order"
+        },
+        {
+            "when": [["delayed", "when will it arrive"]],
+            "response": "We apologize for the delay in your order (Order ID: {order_id}). Please check the tracking details on our website. As a gesture of goodwill, use code DELAY10 for a 10% discount on your next order.",
+            "escalation": "negative_without_order"
+        },
+        {
+            "when": [["couldn’t find my address"]],
+            "response": "We're sorry the rider couldn't find your address for Order ID: {order_id}. Please verify your address in the 'Profile' section or contact the rider via the app.",
+            "escalation": "negative"
+        },
+        {
+            "when": [["change my delivery address"]],
+            "response": "To change your delivery address for Order ID: {order_id}, visit the 'Order Details' section on our website or app before dispatch. Contact support if the order is already in transit.",
+            "escalation": "never"
+        },
+        {
+            "when": [["not available to receive"]],
+            "response": "If you're unavailable to receive your delivery (Order ID: {order_id}), our rider will attempt redelivery. Check our delivery policy on the website for details.",
+            "escalation": "never"
+        },
+        {
+            "when": [["marked as completed"]],
+            "response": "We're sorry your order (Order ID: {order_id}) was marked as completed but not received. This issue requires further investigation.",
+            "escalation": "always"
+        },
+        {
+            "when": [],
+            "response": "For delivery issues with Order ID: {order_id}, please check the 'Track Order' section on our website or provide more details.",
+            "escalation": "negative"
+        }
+    ],
+    "Payments": [
+        {
+            "when": [["incorrectly", "without permission"]],
+            "response": "We're sorry for the incorrect charge on Order ID: {order_id}. Please verify the transaction details in your account or provide more information for investigation.",
+            "escalation": "always"
+        },
+        {
+            "when": [["how do i pay", "bkash", "credit card", "cash-on-delivery"]],
+            "response": "You can pay using bKash, credit/debit cards, or cash-on-delivery. Select your preferred method in the 'Payments' section during checkout for Order ID: {order_id}.",
+            "escalation": "never"
+        },
+        {
+            "when": [["not working", "declined"]],
+            "response": "If your payment method for Order ID: {order_id} is not working, ensure sufficient funds and correct details. Try another method or contact your bank.",
+            "escalation": "negative"
+        },
+        {
+            "when": [["multiple payment methods"]],
+            "response": "Currently, we do not support multiple payment methods for a single order (Order ID: {order_id}). Please select one method during checkout.",
+            "escalation": "never"
+        },
+        {
+            "when": [["additional fees"]],
+            "response": "Additional fees (e.g., delivery, platform, VAT) for Order ID: {order_id} are listed at checkout. Review our fee structure in the 'Support' section.",
+            "escalation": "never"
+        },
+        {
+            "when": [["refund for incorrect payment", "overcharge"]],
+            "response": "To request a refund for an incorrect payment or overcharge (Order ID: {order_id}), submit a request in the 'Refund' section on our website.",
+            "escalation": "negative"
+        },
+        {
+            "when": [],
+            "response": "For payment issues with Order ID: {order_id}, visit the 'Payments' section on our website or provide more details.",
+            "escalation": "negative"
+        }
+    ],
+    "Account": [
+        {
+            "when": [["create", "log in"]],
+            "response": "To create or log into your account, visit the 'Sign Up' or 'Login' page on our website or app and follow the instructions.",
+            "escalation": "never"
+        },
+        {
+            "when": [["forgot my password", "reset"]],
+            "response": "To reset your password, go to the 'Login' page on our website, click 'Forgot Password,' and follow the steps to receive a reset link.",
+            "escalation": "never"
+        },
+        {
+            "when": [["locked", "suspended"]],
+            "response": "If your account is locked or suspended, please check your email for details or provide more information for assistance.",
+            "escalation": "always"
+        },
+        {
+            "when": [["update", "change"]],
+            "response": "To update your account details (e.g., phone number, email, address), log in and navigate to the 'Profile' section on our website or app.",
+            "escalation": "never"
+        },
+        {
+            "when": [["access certain features"]],
+            "response": "If you can't access certain features, ensure your account is verified and meets the requirements. Check the 'Help' section or provide more details.",
+            "escalation": "negative"
+        },
+        {
+            "when": [["delete my account", "remove payment information"]],
+            "response": "To delete your account or remove payment information, visit the 'Account Settings' section and follow the instructions.",
+            "escalation": "never"
+        },
+        {
+            "when": [],
+            "response": "For account-related issues, visit the 'Account' section on our website or provide more details for assistance.",
+            "escalation": "negative"
+        }
+    ],
+    "Promotions": [
+        {
+            "when": [["apply a voucher", "promo code"]],
+            "response": "To apply a voucher or promo code to Order ID: {order_id}, enter the code at checkout in the 'Promotions' section on our website or app.",
+            "escalation": "never"
+        },
+        {
+            "when": [["voucher"], ["not working", "invalid"]],
+            "response": "We're sorry your voucher for Order ID: {order_id} isn't working. Ensure the code is valid and meets the terms. Try code WELCOME10 for a 10% discount on your next order.",
+            "escalation": "negative"
+        },
+        {
+            "when": [["terms and conditions"]],
+            "response": "Promotion terms are listed in the 'Offers' section on our website. Ensure your order meets the criteria (e.g., minimum spend, validity).",
+            "escalation": "never"
+        },
+        {
+            "when": [["multiple vouchers"]],
+            "response": "Currently, only one voucher or discount can be applied per order (Order ID: {order_id}). Check the 'Offers' section for details.",
+            "escalation": "never"
+        },
+        {
+            "when": [["eligible"]],
+            "response": "To check promotion eligibility for Order ID: {order_id}, review the terms in the 'Offers' section or verify your account status.",
+            "escalation": "never"
+        },
+        {
+            "when": [["cashback", "discount not applied"]],
+            "response": "If your cashback or discount for Order ID: {order_id} was not applied, ensure the promotion was valid at checkout. Please provide more details for assistance.",
+            "escalation": "negative"
+        },
+        {
+            "when": [],
+            "response": "For promotion inquiries for Order ID: {order_id}, visit the 'Offers' section on our website or provide more details.",
+            "escalation": "negative"
+        }
+    ],
+    "General": [
+        {
+            "when": [["services"]],
+            "response": "We offer a wide range of Aarong clothing, including traditional and modern apparel. Explore all products on our website or app.",
+            "escalation": "never"
+        },
+        {
+            "when": [["place an order", "transaction"]],
+            "response": "To place an order, select your clothing items on our website or app, add to cart, and proceed to checkout.",
+            "escalation": "never"
+        },
+        {
+            "when": [["operating hours", "service availability"]],
+            "response": "Our online store is available 24/7. Physical stores are open from 10 AM to 8 PM daily.",
+            "escalation": "never"
+        },
+        {
+            "when": [["contact customer support"]],
+            "response": "You can reach us via this chatbot, email at support@aarong.com, or call our helpline at +880-123-456-7890.",
+            "escalation": "never"
+        },
+        {
+            "when": [["service available", "delivery areas"]],
+            "response": "Check available delivery areas in the 'Shipping Info' section on our website or app.",
+            "escalation": "never"
+        },
+        {
+            "when": [["terms and conditions"]],
+            "response": "Our terms and conditions are available in the 'Terms' section on our website. Please review them for details.",
+            "escalation": "never"
+        },
+        {
+            "when": [],
+            "response": "Thank you for reaching out! Please provide more details about your query, and we'll assist you promptly.",
+            "escalation": "negative"
+        }
+    ],
+    "Escalation": [
+        {
+            "when": [["live agent", "escalate"]],
+            "response": "Your query has been escalated to {agent_name} (specialty: {agent_specialty}). Please contact them at {agent_contact} with your order ID and details.",
+            "escalation": "never"
+        },
+        {
+            "when": [["how long"], ["respond"]],
+            "response": "A customer service representative will respond within 24-48 hours for Order ID: {order_id}. Please provide your order ID when contacted.",
+            "escalation": "never"
+        },
+        {
+            "when": [],
+            "response": "Your query has been escalated to {agent_name} (specialty: {agent_specialty}). Please contact them at {agent_contact} with your order ID and details.",
+            "escalation": "never"
+        }
+    ]
+}
+
+ESCALATION_POLICIES = {
+    "never": lambda sentiment, order_id: False,
+    "always": lambda sentiment, order_id: True,
+    "negative": lambda sentiment, order_id: sentiment == "Negative",
+    "negative_without_order": lambda sentiment, order_id: sentiment == "Negative" and order_id == "None"
+}
+
+def needs_escalation(policy: str, sentiment: str, order_id: str) -> bool:
+    return ESCALATION_POLICIES[policy](sentiment, order_id)
+
+# All phrases of all rules compiled into one regex. A zero-width lookahead
+# reports the longest phrase starting at each position in a single scan;
+# shorter phrases contained in it are implied, so every phrase present is
+# found. Only rules mentioning a found phrase are then checked, so the cost
+# per query does not grow with the size of the rule table.
+class RuleEngine:
+    def __init__(self, rules: Dict[str, List[dict]]):
+        self.rules = rules
+        phrases = sorted(
+            {phrase for category_rules in rules.values() for rule in category_rules for group in rule["when"] for phrase in group},
+            key=len,
+            reverse=True
+        )
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(phrase) for phrase in phrases) + "))") if phrases else None
+        self._implied = {phrase: frozenset(other for other in phrases if other in phrase) for phrase in phrases}
+        self._candidates = {}
+        self._fallbacks = {}
+        for category, category_rules in rules.items():
+            for priority, rule in enumerate(category_rules):
+                if not rule["when"]:
+                    self._fallbacks.setdefault(category, priority)
+                for group in rule["when"]:
+                    for phrase in group:
+                        self._candidates.setdefault(phrase, {}).setdefault(category, set()).add(priority)
+
+    def phrases_in(self, query_lower: str) -> set:
+        found = set()
+        if self._pattern is not None:
+            for match in self._pattern.finditer(query_lower):
+                found |= self._implied[match.group(1)]
+        return found
+
+    def match(self, category: str, query: str) -> dict:
+        found = self.phrases_in(query.lower())
+        priorities = set()
+        for phrase in found:
+            priorities |= self._candidates[phrase].get(category, set())
+        fallback = self._fallbacks.get(category, len(self.rules[category]))
+        for priority in sorted(p for p in priorities if p < fallback):
+            rule = self.rules[category][priority]
+            if all(any(phrase in found for phrase in group) for group in rule["when"]):
+                return rule
+        return self.rules[category][fallback]
+
+RULE_ENGINE = RuleEngine(RULES)
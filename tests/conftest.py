@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+
+@pytest.fixture
+def support(tmp_path, monkeypatch):
+    # support_chatbot with the stub LLM, a fresh classification cache and no
+    # session store, writing support_dataset.json into a temporary directory
+    import support_chatbot
+    from benchmarks.support_load import make_stub_llm
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SUPPORT_SESSION_BACKEND", "off")
+    monkeypatch.setenv("SUPPORT_CACHE_BACKEND", "memory")
+    support_chatbot.get_classification_cache.cache_clear()
+    support_chatbot.get_session_store.cache_clear()
+    support_chatbot.get_app.cache_clear()
+    support_chatbot.set_llm(make_stub_llm(0.0))
+    yield support_chatbot
+    support_chatbot.set_llm(None)
+    support_chatbot.get_classification_cache.cache_clear()
+    support_chatbot.get_session_store.cache_clear()
+    support_chatbot.get_app.cache_clear()
+
+
+@pytest.fixture
+def forecast_csv(tmp_path):
+    # A small forecast export in shuffled row order, with the kinds of rows
+    # ForecastTable.from_csv drops (zero yhat, week 0, unparseable dates)
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for product in range(12):
+        for week in range(1, rng.integers(2, 15)):
+            rows.append({
+                "ds": str(np.datetime64("2025-01-06") + np.timedelta64(7 * (week - 1), "D")),
+                "yhat": round(float(rng.uniform(1, 100)), 2),
+                "Product Name": f" Product {product:02d} ",
+                "week": week,
+            })
+    rows += [
+        {"ds": "2025-01-06", "yhat": 0, "Product Name": "Product 00", "week": 20},
+        {"ds": "2025-01-06", "yhat": 5.0, "Product Name": "Product 01", "week": 0},
+        {"ds": "not a date", "yhat": 5.0, "Product Name": "Product 02", "week": 21},
+    ]
+    path = tmp_path / "forecast.csv"
+    pd.DataFrame(rows).sample(frac=1, random_state=0).to_csv(path, index=False)
+    return str(path)
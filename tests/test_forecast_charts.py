@@ -0,0 +1,54 @@
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from forecast_charts import MAX_LINE_PRODUCTS, MAX_POINTS, band_figure, line_figure, lttb
+from forecast_data import ForecastTable
+
+
+def synthetic_table(n_products: int, n_weeks: int) -> ForecastTable:
+    rng = np.random.default_rng(0)
+    products = np.array([f"Product {i:03d}" for i in range(n_products)])
+    codes = np.repeat(np.arange(n_products, dtype=np.int32), n_weeks)
+    week = np.tile(np.arange(1, n_weeks + 1, dtype=np.int16), n_products)
+    yhat = rng.uniform(1, 100, len(codes)).astype(np.float32)
+    ds = np.datetime64("2025-01-06") + (week.astype(np.int64) * 7).astype("timedelta64[D]")
+    return ForecastTable(products, codes, week, yhat, ds)
+
+
+@pytest.mark.parametrize("n, n_out", [(1000, 50), (1000, 3), (101, 100), (10, 7)])
+def test_lttb_keeps_endpoints_and_length(n, n_out):
+    rng = np.random.default_rng(1)
+    x = np.arange(n, dtype=np.float64)
+    y = rng.normal(size=n)
+    y[n // 2] = 50  # a spike is always kept
+    x_out, y_out = lttb(x, y, n_out)
+    assert len(x_out) == len(y_out) == n_out
+    assert (x_out[0], x_out[-1]) == (x[0], x[-1])
+    assert (y_out[0], y_out[-1]) == (y[0], y[-1])
+    assert (np.diff(x_out) > 0).all()
+    assert 50 in y_out
+
+
+def test_lttb_returns_short_series_unchanged():
+    x, y = np.arange(5), np.arange(5) * 2.0
+    assert lttb(x, y, 10)[0] is x and lttb(x, y, 2)[1] is y
+
+
+def test_line_figure_stays_within_max_points():
+    table = synthetic_table(80, 600)
+    products = list(table.products)
+    for selected, max_points in [(products[:5], 1000), (products, 1000), (products, MAX_POINTS)]:
+        fig = line_figure(table, selected, max_points=max_points)
+        assert len(fig.data) == min(len(selected), MAX_LINE_PRODUCTS)
+        assert sum(len(trace.x) for trace in fig.data) <= max_points
+        assert all(trace.x[0] == 1 and trace.x[-1] == 600 for trace in fig.data)
+    assert isinstance(line_figure(table, products[:5]).data[0], go.Scatter)
+    assert isinstance(line_figure(table, products).data[0], go.Scattergl)
+
+
+def test_band_figure_size_does_not_depend_on_products():
+    table = synthetic_table(80, 30)
+    small = band_figure(table, list(table.products[:10]))
+    large = band_figure(table, list(table.products))
+    assert [len(trace.x) for trace in small.data] == [len(trace.x) for trace in large.data] == [30] * len(large.data)
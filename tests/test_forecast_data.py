@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+
+import forecast_data
+from forecast_data import ForecastTable, load_forecast
+
+
+def test_series_are_contiguous_and_in_week_order(forecast_csv):
+    table = ForecastTable.from_csv(forecast_csv)
+    assert list(table.products) == sorted(table.products)
+    assert "Product 00" in table.products
+    for product in table.products:
+        rows = table.series(product)
+        assert (table.codes[rows] == table.code(product)).all()
+        assert (np.diff(table.week[rows]) > 0).all()
+    with pytest.raises(KeyError):
+        table.series("Product 99")
+
+
+def test_select_keeps_the_requested_product_order(forecast_csv):
+    table = ForecastTable.from_csv(forecast_csv)
+    products = ["Product 07", "Product 02", "Product 10"]
+    frame = table.select(products)
+    assert list(dict.fromkeys(frame["Product Name"])) == products
+    for product, group in frame.groupby("Product Name", observed=True, sort=False):
+        rows = table.series(product)
+        np.testing.assert_array_equal(group["week"], table.week[rows])
+        np.testing.assert_array_equal(group["yhat"], table.yhat[rows])
+    assert len(frame) == sum(table.series(product).stop - table.series(product).start for product in products)
+    # Rows that from_csv drops never show up
+    assert 20 not in frame["week"].tolist() and (frame["yhat"] != 0).all()
+
+
+def test_first_yhat_is_the_earliest_week(forecast_csv):
+    table = ForecastTable.from_csv(forecast_csv)
+    first = table.first_yhat()
+    assert len(first) == len(table.products)
+    for product, value in zip(table.products, first):
+        assert value == table.yhat[table.series(product)][0]
+    empty = ForecastTable(np.array(["a", "b"]), np.array([1], dtype=np.int32), np.array([1], dtype=np.int16),
+                          np.array([3.5], dtype=np.float32), np.array(["2025-01-06"], dtype="datetime64[D]"))
+    assert np.isnan(empty.first_yhat()[0]) and empty.first_yhat()[1] == np.float32(3.5)
+
+
+def test_load_writes_the_table_only_when_rebuilding(forecast_csv, tmp_path, monkeypatch):
+    os.rename(forecast_csv, tmp_path / forecast_data.FORECAST_CSV)
+    table_path = tmp_path / forecast_data.FORECAST_TABLE
+    parsed = load_forecast(str(tmp_path))
+    assert not table_path.exists()
+    load_forecast(str(tmp_path), rebuild=True)
+    assert table_path.exists()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    # A current table is read without parsing the CSV
+    monkeypatch.setattr(ForecastTable, "from_csv", classmethod(lambda cls, path: pytest.fail("CSV parsed")))
+    loaded = load_forecast(str(tmp_path))
+    np.testing.assert_array_equal(loaded.offsets, parsed.offsets)
+    np.testing.assert_array_equal(loaded.yhat, parsed.yhat)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from forecast_data import ForecastTable
+from forecast_insights import product_insights, top_movers
+
+
+def cleaned(path):
+    df = pd.read_csv(path)
+    df["Product Name"] = df["Product Name"].str.strip()
+    df["ds"] = pd.to_datetime(df["ds"], errors="coerce")
+    df = df[df["ds"].notnull() & (df["yhat"] != 0) & (df["week"] != 0)]
+    return df.sort_values(["Product Name", "week"])
+
+
+def test_matches_pandas_groupby(forecast_csv):
+    insights = product_insights(ForecastTable.from_csv(forecast_csv))
+    groups = cleaned(forecast_csv).groupby("Product Name")
+    assert list(insights.index) == sorted(groups.groups)
+    np.testing.assert_array_equal(insights["weeks"], groups.size())
+    np.testing.assert_allclose(insights["range"], groups["yhat"].max() - groups["yhat"].min(), rtol=1e-5)
+    np.testing.assert_allclose(insights["mean"], groups["yhat"].mean(), rtol=1e-5)
+    np.testing.assert_allclose(insights["first"], groups["yhat"].first(), rtol=1e-5)
+    np.testing.assert_allclose(insights["last"], groups["yhat"].last(), rtol=1e-5)
+    peak_week = groups[["week", "yhat"]].apply(lambda g: g["week"].iloc[int(np.argmax(g["yhat"].to_numpy()))])
+    np.testing.assert_array_equal(insights["peak_week"], peak_week)
+    slope = groups[["week", "yhat"]].apply(lambda g: np.polyfit(g["week"], g["yhat"], 1)[0] if len(g) > 1 else 0.0)
+    np.testing.assert_allclose(insights["slope"], slope, rtol=1e-4, atol=1e-6)
+    max_drop = groups["yhat"].apply(lambda s: max(-s.diff().min(), 0) if len(s) > 1 else 0.0)
+    np.testing.assert_allclose(insights["max_weekly_drop"], max_drop, rtol=1e-5, atol=1e-6)
+
+
+def test_top_movers_orders_by_slope(forecast_csv):
+    insights = product_insights(ForecastTable.from_csv(forecast_csv))
+    risers, fallers = top_movers(insights, n=3)
+    assert list(risers["slope"]) == sorted(insights["slope"], reverse=True)[:3]
+    assert list(fallers["slope"]) == sorted(insights["slope"])[:3]
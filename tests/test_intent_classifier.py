@@ -0,0 +1,73 @@
+import pytest
+
+from intent_classifier import IntentClassifier, detect_sentiment, extract_order_id
+from text_index import ExampleIndex
+
+
+@pytest.mark.parametrize("query, order_id", [
+    ("Where is order 12345?", "12345"),
+    ("Order ID #98765 has not arrived.", "98765"),
+    ("Order ID: 123456, please check", "123456"),
+    ("ORD-1234 was delivered late", "ORD-1234"),
+    ("my order ar#55555 is damaged", "ar#55555"),
+])
+def test_extracts_order_ids(query, order_id):
+    assert extract_order_id(query) == order_id
+
+
+@pytest.mark.parametrize("query", [
+    "I bought this dress in 2024",
+    "Call me at 880-1234-567890",
+    "My number is +8801712345678",
+    "My number is 01712345678",
+    "My number is +880 1712345678",
+    "It was delivered on 2024-05-01",
+    "It was delivered on 12/05/2024",
+    "I paid 1500.00 taka",
+    "I was charged 12,500 taka",
+    "Card 4111111111111111 was declined",
+    "Where is my order?",
+])
+def test_ignores_numbers_that_are_not_order_ids(query):
+    assert extract_order_id(query) == "None"
+
+
+@pytest.mark.parametrize("query, sentiment", [
+    ("My parcel was delivered late", "Negative"),
+    ("Thank you, I love the kurta", "Positive"),
+    ("How do I reset my password?", "Neutral"),
+])
+def test_detect_sentiment(query, sentiment):
+    assert detect_sentiment(query) == sentiment
+
+
+def test_intent_classifier_confidence():
+    classifier = IntentClassifier(ExampleIndex([
+        {"query": "Where is my order?", "category": "Delivery"},
+        {"query": "When will my order arrive?", "category": "Delivery"},
+        {"query": "How do I get a refund?", "category": "Refunds"},
+    ]))
+    category, confidence = classifier.predict("where is my order")
+    assert category == "Delivery"
+    assert confidence > 0.6
+    assert classifier.predict("qzx")[1] < 0.6
+
+
+def test_local_classifier_threshold(support, monkeypatch):
+    query = "Where is my order?"
+    monkeypatch.setattr(support, "LOCAL_CLASSIFIER_THRESHOLD", 0.0)
+    assert support.classify_locally(query)["classification_source"] == "local"
+    monkeypatch.setattr(support, "LOCAL_CLASSIFIER_THRESHOLD", 1.01)
+    assert support.classify_locally(query) is None
+    # Below the threshold the query goes to the LLM
+    result = support.run_customer_support(query, "threshold")
+    assert result["classification_source"] == "llm"
+    assert support.llm_metrics()["calls"] == 1
+
+
+def test_confident_local_result_skips_llm(support, monkeypatch):
+    monkeypatch.setattr(support, "LOCAL_CLASSIFIER_THRESHOLD", 0.0)
+    result = support.run_customer_support("Where is my order 12345?", "local")
+    assert result["classification_source"] == "local"
+    assert result["order_id"] == "12345"
+    assert support.llm_metrics()["calls"] == 0
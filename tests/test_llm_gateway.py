@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+from llm_gateway import CircuitBreaker, CircuitOpenError, LLMGateway, LLMUnavailableError, is_retryable
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class ScriptedLLM:
+    # Plays back a list of results; exceptions are raised, anything else returned
+    def __init__(self, *outcomes, delay=0.0):
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.delay)
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_gateway(llm, **kwargs):
+    kwargs.setdefault("backoff_base", 0.0)
+    return LLMGateway(llm, **kwargs)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (TimeoutError(), True),
+    (ConnectionResetError(), True),
+    (StatusError(429), True),
+    (StatusError(503), True),
+    (StatusError(400), False),
+    (StatusError(401), False),
+    (ValueError("bad prompt"), False),
+    (KeyError("content"), False),
+])
+def test_is_retryable(error, expected):
+    assert is_retryable(error) is expected
+
+
+def test_is_retryable_extra_transient_errors():
+    class TransportError(Exception):
+        pass
+
+    assert not is_retryable(TransportError())
+    assert is_retryable(TransportError(), (TransportError,))
+
+
+def test_breaker_opens_after_threshold_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    # Only one trial at a time
+    assert not breaker.allow()
+
+
+def test_breaker_trial_success_closes():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_trial_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0.05)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_retries_transient_errors_then_succeeds():
+    llm = ScriptedLLM(StatusError(503), TimeoutError(), "ok")
+    gateway = make_gateway(llm, max_retries=2)
+    assert gateway.invoke("hi") == "ok"
+    assert llm.calls == 3
+    assert gateway.metrics()["retries"] == 2
+
+
+def test_does_not_retry_client_errors():
+    llm = ScriptedLLM(StatusError(400))
+    gateway = make_gateway(llm, max_retries=3)
+    with pytest.raises(LLMUnavailableError):
+        gateway.invoke("hi")
+    assert llm.calls == 1
+
+
+def test_gateway_opens_breaker_and_rejects():
+    llm = ScriptedLLM(StatusError(500))
+    gateway = make_gateway(llm, max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError):
+            gateway.invoke("hi")
+    with pytest.raises(CircuitOpenError):
+        gateway.invoke("hi")
+    assert llm.calls == 2
+    assert gateway.metrics()["circuit"] == "open"
+
+
+def test_half_open_trial_released_when_no_slot():
+    # The timed-out first call opens the breaker but its request keeps the
+    # only slot; once half-open, a call that cannot get the slot must not
+    # use up the trial
+    release = threading.Event()
+
+    class BlockingLLM:
+        def invoke(self, prompt):
+            release.wait(5)
+            return "ok"
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    gateway = make_gateway(BlockingLLM(), max_concurrency=1, timeout=0.1, max_retries=0, breaker=breaker)
+    with pytest.raises(LLMUnavailableError):
+        gateway.invoke("hangs")
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    with pytest.raises(LLMUnavailableError):
+        gateway.invoke("waits for a slot")
+    release.set()
+    while gateway.metrics()["in_flight"]:
+        time.sleep(0.01)
+    assert gateway.invoke("trial") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_slot_held_until_timed_out_call_finishes():
+    llm = ScriptedLLM("ok", delay=0.3)
+    gateway = make_gateway(llm, max_concurrency=1, timeout=0.1, max_retries=0)
+    with pytest.raises(LLMUnavailableError):
+        gateway.invoke("slow")
+    # The abandoned request still runs upstream, so it keeps its slot
+    assert gateway.metrics()["in_flight"] == 1
+    with pytest.raises(LLMUnavailableError):
+        gateway.invoke("no slot yet")
+    assert llm.calls == 1
+    time.sleep(0.3)
+    assert gateway.metrics()["in_flight"] == 0
@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+import pytest
+
+import recommender
+from recommender import IVFIndex, NeighborStore, ProductCatalog, SimilarityIndex, apply_update, publish_artifacts
+
+
+class WordVectors:
+    # Minimal gensim KeyedVectors stand-in: fixed random vectors per token
+    def __init__(self, words, vector_size: int = 16, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.vector_size = vector_size
+        self.key_to_index = {word: i for i, word in enumerate(words)}
+        self.matrix = rng.normal(size=(len(words), vector_size)).astype(np.float32)
+
+    def __getitem__(self, tokens):
+        return self.matrix[[self.key_to_index[token] for token in tokens]]
+
+
+WORDS = "red blue green silk cotton kurta saree shirt panjabi shawl".split() + [str(n) for n in range(200)]
+
+
+def product_names(n: int, seed: int = 0) -> list[str]:
+    # Every name appears at most twice so same-name exclusion is exercised
+    rng = np.random.default_rng(seed)
+    names = [" ".join(rng.choice(WORDS[:10], 3)) + f" {i}" for i in range(n - n // 5)]
+    return names + [names[i] for i in range(n // 5)]
+
+
+def make_catalog(names: list[str]) -> ProductCatalog:
+    return ProductCatalog.from_columns({"Product Name": names, "Link": [f"https://example.com/{i}" for i in range(len(names))]})
+
+
+def full_store(word_vectors, catalog: ProductCatalog, k: int) -> NeighborStore:
+    vectors = recommender._normalize(recommender.embed_texts(word_vectors, catalog.column("Product Name")))
+    return NeighborStore.build(vectors @ vectors.T, catalog.column("Product Name"), k=k)
+
+
+def old_recommend(similarity: np.ndarray, names: list[str], row: int) -> list[int]:
+    # recommend() before the SimilarityIndex engine: full sort, skip the query, filter same names
+    cloth_list = sorted(list(enumerate(similarity[row])), reverse=True, key=lambda x: x[1])[1:10]
+    recommended = []
+    for i in cloth_list:
+        if names[i[0]] != names[row]:
+            recommended.append(i[0])
+        if len(recommended) >= 5:
+            break
+    return recommended
+
+
+def test_top_k_matches_sorted_recommend():
+    rng = np.random.default_rng(1)
+    names = product_names(200)
+    similarity = rng.random((200, 200)).astype(np.float32)
+    np.fill_diagonal(similarity, 1.0)
+    index = SimilarityIndex(similarity, names, chunk_size=64)
+    indices, _ = index.top_k(np.arange(200), k=5)
+    for row in range(200):
+        assert indices[row].tolist() == old_recommend(similarity, names, row)
+        assert [i for i, _ in index.recommend(row)] == old_recommend(similarity, names, row)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1024])
+def test_patched_store_equals_full_rebuild(chunk_size):
+    word_vectors = WordVectors(WORDS)
+    names = product_names(120)
+    catalog = make_catalog(names)
+    store = full_store(word_vectors, catalog, k=8)
+    products = [
+        {"Product Name": "blue silk saree new", "Link": "https://example.com/new-1"},
+        {"Product Name": "red cotton panjabi new", "Link": "https://example.com/new-2"},
+        {"Product Name": names[3], "Link": "https://example.com/new-3"},
+        {"Product Name": "green shawl shirt renamed", "Link": "https://example.com/5"},
+        {"Product Name": "silk kurta renamed", "Link": "https://example.com/40"},
+    ]
+    new_catalog, patched, ann_index, rows = apply_update(catalog, store, word_vectors, products)
+    assert rows.tolist() == [120, 121, 122, 5, 40]
+    assert len(new_catalog) == len(patched) == len(ann_index) == 123
+    rebuilt = full_store(word_vectors, new_catalog, k=8)
+    np.testing.assert_allclose(patched.scores, rebuilt.scores, rtol=1e-5, atol=1e-6)
+    # Same-name duplicates tie, so check each stored neighbor scores what the list says
+    vectors = recommender._normalize(recommender.embed_texts(word_vectors, new_catalog.column("Product Name")))
+    recomputed = np.einsum("nd,nkd->nk", vectors, vectors[patched.indices])
+    np.testing.assert_allclose(recomputed, patched.scores, rtol=1e-5, atol=1e-6)
+    chunked = store.patched(ann_index.vectors, rows, new_catalog.ids("Product Name"), chunk_size=chunk_size)
+    np.testing.assert_allclose(chunked.scores, patched.scores, rtol=1e-5, atol=1e-6)
+    # The original store is left as it is
+    np.testing.assert_array_equal(store.indices, full_store(word_vectors, catalog, k=8).indices)
+
+
+def test_catalog_updated_replaces_and_appends():
+    catalog = make_catalog(["red kurta", "blue saree"])
+    updated, rows = catalog.updated([
+        {"Product Name": "green shawl", "Link": "https://example.com/9"},
+        {"Product Name": "red silk kurta", "Link": "https://example.com/0"},
+    ])
+    assert rows.tolist() == [2, 0]
+    assert updated.column("Product Name") == ["red silk kurta", "blue saree", "green shawl"]
+    assert updated.find("Product Name", "green shawl") == 2
+    assert catalog.column("Product Name") == ["red kurta", "blue saree"]
+
+
+def test_ann_index_update_keeps_centroids_and_assigns_new_rows():
+    word_vectors = WordVectors(WORDS)
+    names = product_names(100)
+    index = IVFIndex(recommender.embed_texts(word_vectors, names), names, n_lists=8)
+    new_names = ["blue silk shawl new", "red kurta renamed"]
+    updated = index.updated([100, 7], recommender.embed_texts(word_vectors, new_names), new_names)
+    np.testing.assert_array_equal(updated.centroids, index.centroids)
+    assert sorted(np.concatenate(updated.lists).tolist()) == list(range(101))
+    assert updated.product_names[100] == "blue silk shawl new" and updated.product_names[7] == "red kurta renamed"
+    exact, _ = updated.query(updated.vectors[100], k=5, exclude_name="blue silk shawl new", n_probe=len(updated.centroids))
+    assert 100 not in exact.tolist()
+    assert len(index) == 100
+
+
+def test_publish_switches_current_and_prunes(tmp_path):
+    model_dir = str(tmp_path)
+    word_vectors = WordVectors(WORDS)
+    names = product_names(40)
+    catalog = make_catalog(names)
+    store = full_store(word_vectors, catalog, k=5)
+    ann_index = IVFIndex(recommender.embed_texts(word_vectors, names), names)
+    assert recommender.artifact_version(model_dir) is None
+
+    versions = [publish_artifacts(model_dir, catalog, store, ann_index, keep=2) for _ in range(4)]
+    assert len(set(versions)) == 4
+    root = os.path.join(model_dir, recommender.ARTIFACTS_DIR)
+    assert os.path.islink(os.path.join(root, recommender.CURRENT_LINK))
+    assert recommender.artifact_version(model_dir) == versions[-1]
+    assert sorted(name for name in os.listdir(root) if name.startswith("v")) == sorted(versions[-2:])
+    assert not [name for name in os.listdir(root) if name.startswith(".")]
+
+    loaded_catalog, loaded_store = recommender.load_artifacts(model_dir)
+    assert loaded_catalog.column("Product Name") == names
+    np.testing.assert_array_equal(loaded_store.indices, store.indices)
+    loaded_index = recommender.load_ivf_index(model_dir, versions[-1], loaded_catalog.column("Product Name"))
+    for a, b in zip(loaded_index.lists, ann_index.lists):
+        assert sorted(a.tolist()) == sorted(b.tolist())
+    assert loaded_index.recommend(3) == ann_index.recommend(3)
+
+
+def test_publish_rejects_mismatched_rows(tmp_path):
+    catalog = make_catalog(["red kurta", "blue saree", "green shawl"])
+    store = NeighborStore(np.zeros((2, 5), dtype=np.int32), np.zeros((2, 5), dtype=np.float32))
+    with pytest.raises(ValueError):
+        publish_artifacts(str(tmp_path), catalog, store)
+    assert recommender.artifact_version(str(tmp_path)) is None
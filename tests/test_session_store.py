@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from session_store import FileSessionStore, MemorySessionStore, SessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite", "file"])
+def make_store(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "sqlite":
+            return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), **kwargs)
+        if request.param == "file":
+            return FileSessionStore(str(tmp_path / "sessions"), **kwargs)
+        return MemorySessionStore(**kwargs)
+    return make
+
+
+def test_hooks_are_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_put_is_buffered_until_batch_is_full(make_store):
+    store = make_store(batch_size=2, flush_interval=60)
+    store.put("a", {"turn": 1})
+    assert store._pending
+    assert store.get("a") == {"turn": 1}
+    store.put("b", {"turn": 1})
+    assert not store._pending
+    assert store.get("b") == {"turn": 1}
+
+
+def test_expired_records_are_removed_every_n_flushes(make_store):
+    store = make_store(ttl_seconds=0.05, batch_size=1, expire_every=2)
+    store.put("old", {"turn": 1})
+    time.sleep(0.1)
+    assert store.get("old") is None
+    assert store._read("old") is not None
+    store.put("new", {"turn": 1})
+    assert store._read("old") is None
+    assert store.get("new") == {"turn": 1}
+
+
+def test_background_flush_writes_without_more_puts(make_store):
+    store = make_store(batch_size=100, flush_interval=0.05, background_flush=True)
+    store.put("a", {"turn": 1})
+    time.sleep(0.2)
+    assert not store._pending
+    assert store._read("a")["value"] == {"turn": 1}
+    store.close()
@@ -0,0 +1,95 @@
+import csv
+import json
+
+import pytest
+
+import support_batch
+
+
+@pytest.fixture
+def llm_only(support, monkeypatch):
+    monkeypatch.setattr(support, "LOCAL_CLASSIFIER_THRESHOLD", 1.01)
+    monkeypatch.setattr(support, "CLASSIFY_BATCH_SIZE", 8)
+    return support
+
+
+def tickets(n):
+    return [(str(i), f"Question {i} about my parcel, order {10000 + i}") for i in range(n)]
+
+
+def test_batches_llm_classification(llm_only, tmp_path):
+    output = str(tmp_path / "triage.jsonl")
+    stats = support_batch.triage(tickets(20), output, batch_size=10)
+    assert stats["processed"] == 20
+    # Each batch of 10 is sent as chunks of 8 and 2: 4 calls, not 20
+    assert llm_only.llm_metrics()["calls"] == 4
+    with open(output, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert {record["classification_source"] for record in records} == {"batch"}
+    assert records[3]["order_id"] == "10003"
+
+
+def test_classify_batch_matches_single_classification(llm_only):
+    query = "My kurta arrived torn, order 12345"
+    batched = llm_only.classify_batch(["hello", query])
+    assert batched[0] is None
+    single = llm_only.run_customer_support(query + " ", "single")
+    assert single["classification_source"] == "cache"
+    assert (batched[1]["category"], batched[1]["order_id"]) == (single["category"], single["order_id"])
+
+
+def test_repeated_ids_are_triaged_once(llm_only, tmp_path):
+    output = str(tmp_path / "triage.jsonl")
+    stats = support_batch.triage(tickets(3) + tickets(2), output)
+    assert (stats["processed"], stats["duplicates"]) == (3, 2)
+    assert support_batch.completed_ids(output) == {"0", "1", "2"}
+
+
+def test_skipped_counts_only_tickets_in_this_input(llm_only, tmp_path):
+    output = str(tmp_path / "triage.jsonl")
+    support_batch.triage(tickets(5), output)
+    stats = support_batch.triage(tickets(2) + [("7", "Where is my parcel, order 10007?")], output)
+    assert (stats["skipped"], stats["processed"]) == (2, 1)
+
+
+def test_truncated_csv_row_is_redone(llm_only, tmp_path):
+    output = str(tmp_path / "triage.csv")
+    support_batch.triage(tickets(3), output)
+    with open(output, "rb+") as f:
+        f.truncate(f.seek(0, 2) - 5)
+    assert support_batch.completed_ids(output) == {"0", "1"}
+    stats = support_batch.triage(tickets(3), output)
+    assert (stats["skipped"], stats["processed"]) == (2, 1)
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["id"] for row in rows] == ["0", "1", "2"]
+    assert all(row["response"] for row in rows)
+
+
+def test_unreadable_rows_are_reported_and_skipped(tmp_path):
+    path = tmp_path / "tickets.jsonl"
+    path.write_text(
+        '{"ticket": "a1", "query": "Where is my parcel?"}\n'
+        '{"ticket": "a2", "query": "cut short\n'
+        '{"query": "No ticket id here"}\n'
+        '["not", "an", "object"]\n'
+        '{"ticket": "a5", "query": "Refund please"}\n',
+        encoding="utf-8"
+    )
+    errors = []
+    rows = list(support_batch.read_tickets(str(path), id_column="ticket", on_error=errors.append))
+    assert rows == [("a1", "Where is my parcel?"), ("a5", "Refund please")]
+    assert [error["row"] for error in errors] == [2, 3, 4]
+    with pytest.raises(ValueError):
+        list(support_batch.read_tickets(str(path), id_column="ticket"))
+
+
+def test_csv_rows_without_an_id_are_reported(tmp_path):
+    path = tmp_path / "tickets.csv"
+    path.write_text("ticket,query\nc1,Where is my parcel?\n,Missing id\nc3\n", encoding="utf-8")
+    errors = []
+    rows = list(support_batch.read_tickets(str(path), id_column="ticket", on_error=errors.append))
+    assert rows == [("c1", "Where is my parcel?")]
+    assert [error["row"] for error in errors] == [2]
+    with pytest.raises(ValueError):
+        list(support_batch.read_tickets(str(path), id_column="id"))
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+import support_cache
+from support_cache import ClassificationCache, MemoryBackend, SQLiteBackend
+
+DELIVERY = {"category": "Delivery", "sentiment": "Neutral", "order_id": "None"}
+REFUND = {"category": "Refunds", "sentiment": "Negative", "order_id": "None"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    return SQLiteBackend(str(tmp_path / "cache.sqlite3"), touch_batch_size=4)
+
+
+def test_exact_hit_after_miss(backend):
+    cache = ClassificationCache(backend)
+    assert cache.get("Where is my parcel?") is None
+    cache.set("Where is my parcel?", DELIVERY)
+    # Case, whitespace and trailing punctuation do not matter
+    assert cache.get("  where IS my   parcel ") == (DELIVERY, "exact")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_expired_entries_miss(backend):
+    cache = ClassificationCache(backend, ttl_seconds=0.05)
+    cache.set("where is my parcel", DELIVERY)
+    time.sleep(0.1)
+    assert cache.get("where is my parcel") is None
+
+
+def test_evicts_least_recently_used(backend):
+    cache = ClassificationCache(backend, max_entries=2)
+    cache.set("first query", DELIVERY)
+    time.sleep(0.01)
+    cache.set("second query", REFUND)
+    time.sleep(0.01)
+    assert cache.get("first query") is not None
+    time.sleep(0.01)
+    cache.set("third query", DELIVERY)
+    assert cache.get("second query") is None
+    assert cache.get("first query") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_semantic_hit_and_threshold(backend):
+    cache = ClassificationCache(backend, similarity_threshold=0.7)
+    cache.set("I want a refund for my dress", REFUND)
+    assert cache.get("i want a refund for my dresses") == (REFUND, "semantic")
+    assert cache.get("do you ship to Chittagong") is None
+
+
+def test_key_matrix_updated_without_reembedding(backend, monkeypatch):
+    cache = ClassificationCache(backend, max_entries=3, similarity_threshold=0.7)
+    for n in range(3):
+        cache.set(f"order number {n} has not arrived yet", DELIVERY)
+    assert cache.get("order number 1 has not arrived yet, help") == (DELIVERY, "semantic")
+    embedded = []
+    real_embed = support_cache.embed
+    monkeypatch.setattr(support_cache, "embed", lambda texts: embedded.append(list(texts)) or real_embed(texts))
+    cache.set("I want a refund for my dress", REFUND)
+    assert cache.get("i want a refund for my dresses") == (REFUND, "semantic")
+    # Only the new key and the query were embedded, not every cached key
+    assert embedded == [["i want a refund for my dress"], ["i want a refund for my dresses"]]
+
+
+def test_semantic_lookup_skips_evicted_keys(backend):
+    cache = ClassificationCache(backend, max_entries=1, similarity_threshold=0.7)
+    cache.set("I want a refund for my dress", REFUND)
+    assert cache.get("i want a refund for my dresses") is not None
+    cache.set("where is my parcel", DELIVERY)
+    assert cache.get("i want a refund for my dresses") is None
+
+
+def test_sqlite_hits_do_not_commit_each_time(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), touch_batch_size=100)
+    cache = ClassificationCache(backend)
+    cache.set("where is my parcel", DELIVERY)
+    changes = backend._conn.total_changes
+    for _ in range(10):
+        assert cache.get("where is my parcel") is not None
+    assert backend._conn.total_changes == changes
@@ -0,0 +1,92 @@
+import pytest
+
+
+@pytest.fixture
+def llm_only(support, monkeypatch):
+    # Disable the local fast path so every new query is classified by the LLM
+    monkeypatch.setattr(support, "LOCAL_CLASSIFIER_THRESHOLD", 1.01)
+    return support
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"category": "Refunds", "sentiment": "Negative", "order_id": "12345"}',
+     {"category": "Refunds", "sentiment": "Negative", "order_id": "12345"}),
+    ('Sure! {"category": "Delivery", "sentiment": "very positive", "order_id": null}',
+     {"category": "Delivery", "sentiment": "Positive", "order_id": "None"}),
+    ("Delivery", None),
+    ('{"sentiment": "Neutral"}', None),
+])
+def test_parse_classification(support, content, expected):
+    assert support.parse_classification(content) == expected
+
+
+def test_fused_classification_is_one_llm_call(llm_only):
+    result = llm_only.run_customer_support("My kurta arrived torn, order 12345", "fused")
+    assert result["classification_source"] == "llm"
+    assert result["order_id"] == "12345"
+    assert llm_only.llm_metrics()["calls"] == 1
+
+
+def test_repeated_query_hits_the_cache(llm_only):
+    first = llm_only.run_customer_support("Can I pay with bKash?", "cache-1")
+    second = llm_only.run_customer_support("  can I pay with bkash ", "cache-2")
+    assert first["classification_source"] == "llm"
+    assert second["classification_source"] == "cache"
+    assert second["category"] == first["category"]
+    stats = llm_only.get_classification_cache().stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert llm_only.llm_metrics()["calls"] == 1
+
+
+def test_unparseable_fused_reply_falls_back_without_rechecking(llm_only, monkeypatch):
+    from benchmarks.support_load import make_stub_llm
+    from langchain_core.messages import AIMessage
+
+    class GarbledJSONLLM:
+        # The stub, except that the fused JSON reply cannot be parsed
+        def __init__(self):
+            self.llm = make_stub_llm(0.0)
+
+        def invoke(self, prompt):
+            reply = self.llm.invoke(prompt)
+            return AIMessage(content="Sorry, no JSON today") if reply.content.startswith("{") else reply
+
+    local_calls = []
+    classify_locally = llm_only.classify_locally
+    monkeypatch.setattr(llm_only, "classify_locally", lambda query: local_calls.append(query) or classify_locally(query))
+    llm_only.set_llm(GarbledJSONLLM())
+    result = llm_only.run_customer_support("My kurta arrived torn, order 12345", "garbled")
+    assert result["classification_source"] == "llm"
+    assert result["order_id"] == "12345"
+    # Fused call, then categorize, sentiment and order id
+    assert llm_only.llm_metrics()["calls"] == 4
+    assert len(local_calls) == 1
+    stats = llm_only.get_classification_cache().stats()
+    assert (stats["hits"], stats["misses"]) == (0, 1)
+
+def test_unavailable_llm_falls_back_to_local_classifier(llm_only, monkeypatch):
+    class DownLLM:
+        def invoke(self, prompt):
+            raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(llm_only, "LLM_RETRIES", 0)
+    monkeypatch.setenv("SUPPORT_LLM_BREAKER_FAILURES", "1")
+    llm_only.set_llm(DownLLM())
+    result = llm_only.run_customer_support("Where is my order 12345?", "down")
+    assert result["classification_source"] == "fallback"
+    assert result["order_id"] == "12345"
+    assert result["response"]
+    assert llm_only.llm_metrics()["circuit"] == "open"
+
+
+@pytest.mark.parametrize("mode", ["sequential", "parallel"])
+def test_stub_answers_each_classification_step(llm_only, monkeypatch, mode):
+    # The few-shot examples mention order IDs; the stub must still answer the categorize step with a category
+    from benchmarks.support_load import CATEGORIES
+
+    monkeypatch.setattr(llm_only, "CLASSIFICATION_MODE", mode)
+    result = llm_only.run_customer_support("Why was my order delivered late? Order ID 55555.", mode)
+    assert result["category"] in CATEGORIES
+    assert result["sentiment"] in ("Positive", "Neutral", "Negative")
+    assert result["order_id"] == "55555"
+    assert llm_only.llm_metrics()["calls"] == 3
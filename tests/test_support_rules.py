@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from support_rules import RULE_ENGINE, RULES, RuleEngine, needs_escalation
+
+PHRASES = sorted({phrase for rules in RULES.values() for rule in rules for group in rule["when"] for phrase in group})
+FILLER = ["my", "order", "please", "the", "is", "it", "help", "why", "a", "today"]
+
+
+def first_match(category, query):
+    # The if/elif chains the table replaced: the first rule whose groups all have a phrase in the query
+    query_lower = query.lower()
+    for rule in RULES[category]:
+        if all(any(phrase in query_lower for phrase in group) for group in rule["when"]):
+            return rule
+
+
+def rule_index(category, query):
+    return RULES[category].index(RULE_ENGINE.match(category, query))
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("How do I apply a voucher?", 0),
+    # The first rule wins even when a later one matches too
+    ("I tried to apply a voucher but it says invalid", 0),
+    ("My voucher is not working", 1),
+    ("This VOUCHER code is invalid", 1),
+    # Both groups are needed
+    ("Where do I enter my voucher?", 6),
+    ("The code is invalid", 6),
+    # "multiple vouchers" implies "voucher", so the earlier two-group rule matches first
+    ("Multiple vouchers not working", 1),
+    ("Can I use multiple vouchers?", 3),
+    ("Am I eligible for the sale?", 4),
+])
+def test_promotions_rule_priority(query, expected):
+    assert rule_index("Promotions", query) == expected
+
+
+@pytest.mark.parametrize("category, query, expected", [
+    # The scan reports the longest phrase at a position; shorter ones inside it are implied
+    ("Account", "How do I change my delivery address?", 3),
+    ("Delivery", "How do I change my delivery address?", 3),
+    ("Refunds", "My order was canceled without notification", 0),
+    ("Complaints", "My order was canceled without notification", 4),
+    ("Delivery", "Tracking says it is delayed", 0),
+    ("Escalation", "How long will it take for someone to respond?", 1),
+    ("Escalation", "How long is delivery?", 2),
+])
+def test_implied_phrases(category, query, expected):
+    assert rule_index(category, query) == expected
+
+
+def test_matches_first_matching_rule_on_generated_queries():
+    rng = random.Random(0)
+    for _ in range(5000):
+        words = rng.sample(FILLER, 3) + rng.sample(PHRASES, rng.randint(0, 3))
+        rng.shuffle(words)
+        query = " ".join(words)
+        if rng.random() < 0.3:
+            query = query.upper()
+        for category in RULES:
+            assert RULE_ENGINE.match(category, query) is first_match(category, query), (category, query)
+
+
+def test_engine_without_phrases_uses_fallback():
+    engine = RuleEngine({"General": [{"when": [], "response": "fallback", "escalation": "never"}]})
+    assert engine.match("General", "anything")["response"] == "fallback"
+
+
+@pytest.mark.parametrize("policy, sentiment, order_id, expected", [
+    ("never", "Negative", "None", False),
+    ("always", "Positive", "12345", True),
+    ("negative", "Negative", "12345", True),
+    ("negative", "Neutral", "None", False),
+    ("negative_without_order", "Negative", "None", True),
+    ("negative_without_order", "Negative", "12345", False),
+    ("negative_without_order", "Neutral", "None", False),
+])
+def test_escalation_policies(policy, sentiment, order_id, expected):
+    assert needs_escalation(policy, sentiment, order_id) is expected
+
+
+@pytest.mark.parametrize("query, sentiment, escalates", [
+    ("My voucher is invalid", "Negative", True),
+    ("My voucher is invalid", "Neutral", False),
+    ("How do I apply a voucher?", "Negative", False),
+])
+def test_promotions_handler(support, query, sentiment, escalates):
+    result = support.handle_promotions({"query": query, "sentiment": sentiment, "order_id": "12345"})
+    assert result["needs_escalation"] is escalates
+    assert "Order ID: 12345" in result["response"]
@@ -0,0 +1,34 @@
+from functools import lru_cache
+import numpy as np
+
+# Local text vectors: hashed character n-grams, L2-normalized. Stateless, so
+# new texts can be embedded without refitting anything.
+@lru_cache(maxsize=None)
+def _vectorizer():
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=2 ** 18, alternate_sign=False, norm="l2")
+
+def embed(texts):
+    return _vectorizer().transform([str(text).lower().strip() for text in texts])
+
+# Cosine nearest-neighbour search over a fixed set of example dicts
+class ExampleIndex:
+    def __init__(self, examples, text_key: str = "query"):
+        self.examples = list(examples)
+        self.text_key = text_key
+        self.matrix = embed([example[text_key] for example in self.examples])
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def scores(self, query: str) -> np.ndarray:
+        return (self.matrix @ embed([query]).T).toarray().ravel()
+
+    def search(self, query: str, n: int = 5) -> list[tuple[dict, float]]:
+        if not self.examples or n <= 0:
+            return []
+        scores = self.scores(query)
+        n = min(n, len(scores))
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.examples[i], float(scores[i])) for i in top]